@@ -1,11 +1,28 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
-import zipfile
 import os
-import shutil
-from PIL import Image
+import time
+from datetime import datetime
+
+from omnis.assets import ZipAssetStore, cv_name
+from omnis.cache import invalidate_cache, read_bytes
+from omnis.cube import SalaryCube
+from omnis.export import EXPORT_DIR, export_bundle, report_nodes, safe_name
+from omnis.formatting import format_ar, format_df
+from omnis.instrument import Tracer, activate, current, span
+from omnis.index import build_matricule_index, employee_slices, extend_sheet_index
+from omnis.ingest import NATURAL_KEYS, merge_delta, merged_digest, read_delta
+from omnis.kpi import kpis_for
+from omnis.organisation import OrgIndex, OrgTree
+from omnis.paging import PAGE_SIZES, absences_par_mois, date_column, filter_period, page_count, page_of, totaux_historique
+from omnis.pipeline import PHASE_START, LoadJob
+from omnis.registry import REGISTRY
+from omnis.schema import normalize_dataset
+from omnis.search import DEFAULT_FIELDS, FIELD_ORDER, SearchIndex
+from omnis.store import STORE
+from omnis.thumbnails import ThumbnailCache
+from omnis.timeseries import TrendSeries
 
 st.set_page_config(page_title="Application Web RH – OMNIS", layout="wide")
 
@@ -14,68 +31,236 @@ st.title("📋 Gestion RH OMNIS")
 # Initialisation de session_state pour suivre les uploads
 if 'files_loaded' not in st.session_state:
     st.session_state.files_loaded = False
-if 'data' not in st.session_state:
-    st.session_state.data = None
-if 'total_employes' not in st.session_state:
-    st.session_state.total_employes = 0
-
-# Fonction pour formater les montants en Ariary avec espace comme séparateur
-def format_ar(value):
-    if pd.isna(value):
-        return "N/A"
-    try:
-        value = float(value)
-    except (ValueError, TypeError):
-        return str(value)
-    formatted = f"{value:,.2f}".replace(",", " ")
-    return f"{formatted} Ar"
-
-# Fonction pour formater les colonnes monétaires d'un DataFrame
-def format_monetary_columns(df):
-    if df.empty:
-        return df
-    df_formatted = df.copy()
-    monetary_keywords = ["salaire", "bonus", "montant", "prime", "indemnité", "sanction", "coût", "cout", "depense", "dépense"]
-    for col in df_formatted.columns:
-        if any(keyword in col.lower() for keyword in monetary_keywords):
-            df_formatted[col] = pd.to_numeric(df_formatted[col], errors='coerce')
-            df_formatted[col] = df_formatted[col].apply(format_ar)
-    return df_formatted
-
-# Fonction pour formater une date en français (ex. : 22 janvier 2025)
-def format_french_date(value):
-    if pd.isna(value):
-        return "N/A"
-    months = {
-        1: 'janvier', 2: 'février', 3: 'mars', 4: 'avril',
-        5: 'mai', 6: 'juin', 7: 'juillet', 8: 'août',
-        9: 'septembre', 10: 'octobre', 11: 'novembre', 12: 'décembre'
+if 'dataset' not in st.session_state:
+    st.session_state.dataset = None
+if 'photos' not in st.session_state:
+    st.session_state.photos = None
+if 'cvs' not in st.session_state:
+    st.session_state.cvs = None
+if 'thumbnails' not in st.session_state:
+    st.session_state.thumbnails = None
+if 'load_job' not in st.session_state:
+    st.session_state.load_job = None
+if 'load_phase' not in st.session_state:
+    st.session_state.load_phase = PHASE_START
+if 'tracer' not in st.session_state:
+    st.session_state.tracer = None
+if 'export_result' not in st.session_state:
+    st.session_state.export_result = None
+
+# Fermeture des ZIP et du pool de vignettes de la session avant leur remplacement
+def release_assets():
+    if st.session_state.thumbnails is not None:
+        st.session_state.thumbnails.shutdown()
+    for store in (st.session_state.photos, st.session_state.cvs):
+        if store is not None:
+            store.close()
+    st.session_state.photos = None
+    st.session_state.cvs = None
+    st.session_state.thumbnails = None
+
+# Instrumentation optionnelle : chaque session a son propre traceur
+run_started = time.perf_counter()
+if st.sidebar.toggle("🩺 Mesures de performance", key="trace_enabled"):
+    if st.session_state.tracer is None:
+        st.session_state.tracer = Tracer()
+    activate(st.session_state.tracer)
+else:
+    activate(None)
+
+# Chargement en arrière-plan : intégration des étapes terminées par le thread de fond
+load_job = st.session_state.load_job
+if load_job is not None:
+    if load_job.error is not None:
+        st.error(f"❌ Erreur lors du chargement des fichiers : {load_job.error}")
+        st.session_state.load_job = None
+        st.session_state.files_loaded = False
+        st.session_state.dataset = None
+    else:
+        # Photos et CV utilisables dès leur indexation
+        if load_job.photos is not None and load_job.cvs is not None and st.session_state.photos is None:
+            release_assets()
+            st.session_state.photos = load_job.photos
+            st.session_state.cvs = load_job.cvs
+            st.session_state.thumbnails = ThumbnailCache(load_job.photos)
+        if load_job.handle is not None:
+            st.session_state.dataset = load_job.handle
+            st.session_state.load_job = None
+            identité = load_job.handle.data.get("Identité", pd.DataFrame())
+            if st.session_state.get("prefetch_thumbs") and not identité.empty:
+                st.session_state.thumbnails.prefetch(identité["Matricule"].tolist())
+        elif load_job.partial is not None and st.session_state.dataset is None:
+            st.session_state.dataset = load_job.partial
+        st.session_state.load_phase = load_job.phase
+
+# Cache disque des classeurs déjà importés (partagé entre sessions et redémarrages)
+with st.sidebar:
+    if st.button("🧹 Vider le cache des classeurs"):
+        invalidate_cache()
+        REGISTRY.invalidate()
+        st.success("Cache des classeurs vidé.")
+    if STORE.exists() and st.button("🗑️ Supprimer les données enregistrées"):
+        STORE.clear()
+        st.success("Données enregistrées supprimées.")
+    # Jeux de données partagés entre les sessions de ce serveur
+    with st.expander("🗄️ Jeux de données en mémoire"):
+        for entry in REGISTRY.stats():
+            st.write(f"`{entry['digest'][:12]}` : {entry['octets'] / 1024**2:.1f} Mo, {entry['sessions']} session(s)")
+    # Temps de lecture par feuille du dernier chargement
+    if st.session_state.dataset is not None:
+        info = st.session_state.dataset.info
+        with st.expander("⏱️ Chargement du classeur"):
+            source = "cache" if info["from_cache"] else "fichier Excel"
+            st.write(f"Lu depuis le {source} en {info['seconds']:.2f} s")
+            for sheet, timing in info["timings"].items():
+                st.write(f"**{sheet}** : {timing['rows']} lignes en {timing['seconds']:.2f} s ({timing['engine']})")
+            for ajout in info.get("ajouts", []):
+                for sheet, counts in ajout["feuilles"].items():
+                    st.write(f"➕ **{sheet}** : {counts['ajoutees']} lignes ajoutées, {counts['remplacees']} remplacées ({ajout['seconds']:.2f} s)")
+        if info.get("memoire"):
+            with st.expander("🧮 Mémoire par feuille (avant → après typage)"):
+                for sheet, mem in info["memoire"].items():
+                    st.write(f"**{sheet}** : {mem['avant'] / 1024**2:.1f} → {mem['apres'] / 1024**2:.1f} Mo")
+
+# Structures précalculées une seule fois par jeu de données (index, cube, organigramme)
+def prepare_dataset(data):
+    identité = data.get("Identité", pd.DataFrame())
+    poste = data.get("Poste_et_Carrière", pd.DataFrame())
+    org_tree = OrgTree(poste=poste)
+    return {
+        "matricule_index": build_matricule_index(data),
+        "search_index": SearchIndex(identité, poste) if not identité.empty else None,
+        "org_tree": org_tree,
+        "org_index": OrgIndex(org_tree, poste, data.get("Salaire"), data.get("Présences_Absences"), data.get("Turnover")),
+        "salary_cube": SalaryCube(poste, data.get("Salaire", pd.DataFrame()), identité, org_tree),
+        "trends": TrendSeries(poste, data.get("Salaire"), data.get("Présences_Absences"), data.get("Turnover"), org_tree),
     }
-    try:
-        dt = pd.to_datetime(value)
-        day = dt.day
-        month = months[dt.month]
-        year = dt.year
-        return f"{day} {month} {year}"
-    except (ValueError, TypeError):
-        return str(value)
-
-# Application du format date sur les colonnes concernées
-def format_date_columns(df):
-    if df.empty:
-        return df
-    df_formatted = df.copy()
-    date_keywords = ["date", "naissance", "debut", "fin", "mois", "annee", "année"]
-    for col in df_formatted.columns:
-        if any(keyword in col.lower() for keyword in date_keywords) or pd.api.types.is_datetime64_any_dtype(df[col]):
-            df_formatted[col] = df_formatted[col].apply(format_french_date)
-    return df_formatted
-
-# Fonction combinée : monétaire + dates
-def format_df(df):
-    df = format_monetary_columns(df)
-    df = format_date_columns(df)
-    return df
+
+# Mise à jour des structures précalculées après un import mensuel : seuls les
+# matricules, les mois et les nœuds touchés par le delta sont recalculés
+def refresh_dataset(derived, previous, data, changes):
+    matricule_index = dict(derived["matricule_index"])
+    salary_cube, org_index, trends = derived["salary_cube"], derived["org_index"], derived["trends"]
+    for sheet, change in changes.items():
+        added, removed = change["ajoutees"], change["remplacees"]
+        if sheet in matricule_index:
+            if removed.empty:
+                matricule_index[sheet] = extend_sheet_index(matricule_index[sheet], added, len(previous[sheet]))
+            else:
+                matricule_index[sheet] = build_matricule_index({sheet: data[sheet]})[sheet]
+        if sheet == "Salaire":
+            months = pd.concat([added["Mois"].astype(object), removed["Mois"].astype(object)]).dropna().unique()
+            salary_cube = salary_cube.with_months(change["periode"], months)
+        org_index = org_index.with_delta(sheet, added, removed)
+        trends = trends.with_delta(sheet, change["periode"], added, removed)
+    return {**derived, "matricule_index": matricule_index, "salary_cube": salary_cube, "org_index": org_index, "trends": trends}
+
+# Import mensuel : ajout des nouvelles périodes au jeu de données courant
+if st.session_state.dataset is not None and st.session_state.load_job is None:
+    with st.sidebar.expander("➕ Import mensuel (nouvelles périodes)"):
+        delta_file = st.file_uploader("Classeur ou CSV des nouvelles lignes", type=["xlsx", "csv"], key="delta_uploader")
+        delta_sheet = st.selectbox("Feuille concernée (CSV)", list(NATURAL_KEYS))
+        if delta_file is not None and st.button("Ajouter au jeu de données"):
+            try:
+                dataset = st.session_state.dataset
+                delta_hash, frames = read_delta(delta_file, sheet=delta_sheet)
+                new_hash = merged_digest(dataset.digest, delta_hash)
+                applied = {}
+
+                def build_merged():
+                    start = time.perf_counter()
+                    data, changes, ignored = merge_delta(dataset.data, frames)
+                    derived = refresh_dataset(dataset.derived, dataset.data, data, changes)
+                    applied.update(changes)
+                    ajout = {
+                        "feuilles": {sheet: {"ajoutees": len(c["ajoutees"]), "remplacees": len(c["remplacees"])} for sheet, c in changes.items()},
+                        "ignorees": ignored,
+                        "seconds": time.perf_counter() - start,
+                    }
+                    return data, derived, {**dataset.info, "ajouts": dataset.info.get("ajouts", []) + [ajout]}
+
+                handle = REGISTRY.acquire(new_hash, build_merged)
+                # Le stockage local reçoit uniquement les lignes du delta
+                store_meta = STORE.meta()
+                if applied and store_meta is not None and store_meta["digest"] == dataset.digest:
+                    STORE.append(new_hash, applied, NATURAL_KEYS)
+                dataset.release()
+                st.session_state.dataset = handle
+                st.rerun()
+
+            except Exception as e:
+                st.error(f"❌ Erreur lors de l'import mensuel : {e}")
+
+# Progression du chargement en arrière-plan ; l'application est relancée dès qu'une
+# nouvelle étape est disponible (jeu partiel publié, chargement terminé)
+@st.fragment(run_every=0.5)
+def load_progress(job):
+    with st.expander("⏳ Chargement en arrière-plan", expanded=True):
+        for name, stage in job.stages.items():
+            detail = f" – {stage['detail']}" if stage["detail"] else ""
+            st.progress(stage["progression"], text=f"{name}{detail}")
+    if job.phase != st.session_state.load_phase:
+        st.rerun()
+
+# Changement de page avant le rendu, pour que l'état des boutons ◀ / ▶ suive le clic
+def turn_page(key, step):
+    st.session_state[f"{key}_page"] = st.session_state.get(f"{key}_page", 0) + step
+
+# Tableau paginé : tri et filtre par période sur toute la tranche, mise en forme
+# et envoi de la seule page visible
+def paged_table(df, key):
+    date_col = date_column(df)
+    col_sort, col_order, col_size, col_period = st.columns(4)
+    with col_sort:
+        sort_by = st.selectbox("Trier par", ["(ordre du fichier)"] + list(df.columns), key=f"{key}_tri")
+    with col_order:
+        ascending = st.radio("Ordre", ["Croissant", "Décroissant"], horizontal=True, key=f"{key}_ordre") == "Croissant"
+    with col_size:
+        page_size = st.selectbox("Lignes par page", PAGE_SIZES, key=f"{key}_taille")
+    start = end = None
+    if date_col is not None and df[date_col].notna().any():
+        with col_period:
+            period = st.date_input("Période", value=(df[date_col].min().date(), df[date_col].max().date()), key=f"{key}_periode")
+        if isinstance(period, (list, tuple)) and len(period) == 2:
+            start, end = period
+    rows = filter_period(df, date_col, start, end)
+
+    n_pages = page_count(len(rows), page_size)
+    page = max(min(st.session_state.get(f"{key}_page", 0), n_pages - 1), 0)
+    st.session_state[f"{key}_page"] = page
+    col_prev, col_next, col_info = st.columns([1, 1, 6])
+    with col_prev:
+        st.button("◀", key=f"{key}_prec", disabled=page == 0, on_click=turn_page, args=(key, -1))
+    with col_next:
+        st.button("▶", key=f"{key}_suiv", disabled=page >= n_pages - 1, on_click=turn_page, args=(key, 1))
+    with col_info:
+        st.caption(f"{len(rows)} lignes – page {page + 1} / {n_pages}")
+    st.dataframe(page_of(rows, page, page_size, None if sort_by == "(ordre du fichier)" else sort_by, ascending),
+                 use_container_width=True)
+
+# Tendances mensuelles lues dans les séries précalculées (omnis.timeseries) : taux de
+# turnover et d'absentéisme du mois et glissants, jours d'absence par motif
+TREND_LABELS = {"": "Mensuel", "_3m": "Glissant 3 mois", "_12m": "Glissant 12 mois"}
+
+def trend_charts(trends, absence_types, scope):
+    col1, col2 = st.columns(2)
+    for col, measure, title in [(col1, "taux_turnover", "Taux de turnover"), (col2, "taux_absenteisme", "Taux d'absentéisme")]:
+        rates = trends[["Mois"] + [measure + suffix for suffix in TREND_LABELS]]
+        rates = rates.rename(columns={measure + suffix: label for suffix, label in TREND_LABELS.items()})
+        if rates.drop(columns="Mois").isna().all().all():
+            continue
+        with col, span(f"graphique : tendance {title.lower()}"):
+            fig = px.line(rates, x="Mois", y=list(TREND_LABELS.values()), markers=True, title=f"{title} – {scope}")
+            fig.update_yaxes(title=f"{title} (%)")
+            fig.update_layout(legend_title_text="")
+            st.plotly_chart(fig, use_container_width=True)
+    if not absence_types.empty:
+        with span("graphique : motifs d'absence"):
+            fig = px.bar(absence_types, x=absence_types.index, y=list(absence_types.columns),
+                         title=f"Jours d'absence par motif – {scope}")
+            fig.update_yaxes(title="Jours")
+            fig.update_layout(legend_title_text="Motif")
+            st.plotly_chart(fig, use_container_width=True)
 
 # ────────────────────────────────────────────────
 #  Section Uploads (visible seulement au démarrage)
@@ -83,43 +268,61 @@ def format_df(df):
 if not st.session_state.files_loaded:
     st.header("🚀 Préparation des fichiers")
 
+    # Reprise des données enregistrées lors d'un import précédent (sans nouvel upload)
+    store_meta = STORE.meta()
+    if store_meta is not None:
+        imported_at = datetime.fromtimestamp(store_meta["importe_le"]).strftime("%d/%m/%Y %H:%M")
+        if st.button(f"📦 Reprendre les données enregistrées (import du {imported_at})"):
+            try:
+                def build_from_store():
+                    start = time.perf_counter()
+                    _, raw = STORE.load()
+                    data, memory = normalize_dataset(raw)
+                    info = {"from_cache": True, "seconds": time.perf_counter() - start, "timings": {}, "memoire": memory}
+                    return data, prepare_dataset(data), info
+
+                handle = REGISTRY.acquire(store_meta["digest"], build_from_store)
+                photos_path, cvs_path = STORE.assets()
+                photos_store = ZipAssetStore(photos_path) if photos_path else None
+
+                if st.session_state.dataset is not None:
+                    st.session_state.dataset.release()
+                st.session_state.files_loaded = True
+                st.session_state.dataset = handle
+                release_assets()
+                st.session_state.photos = photos_store
+                st.session_state.cvs = ZipAssetStore(cvs_path) if cvs_path else None
+                st.session_state.thumbnails = ThumbnailCache(photos_store) if photos_store is not None else None
+                st.rerun()
+
+            except Exception as e:
+                st.error(f"❌ Erreur lors de la lecture des données enregistrées : {e}")
+
     uploaded_excel      = st.file_uploader("📂 Charger le fichier Excel RH", type=["xlsx"], key="excel_uploader")
     uploaded_zip_photos  = st.file_uploader("📂 Charger les photos des employés (.zip)", type=["zip"], key="photos_uploader")
     uploaded_zip_cvs    = st.file_uploader("📂 Charger les CV des employés (.zip)", type=["zip"], key="cvs_uploader")
+    parallel_load       = st.checkbox("⚡ Lecture parallèle des feuilles (gros classeurs)", value=False)
+    prefetch_thumbs     = st.checkbox("🖼️ Pré-générer les vignettes des photos en arrière-plan", value=False)
+    persist_store       = st.checkbox("💾 Enregistrer les données localement (reprise sans nouvel import)", value=False)
 
     if st.button("✅ Vérifier et démarrer l'application"):
         all_uploaded = uploaded_excel is not None and uploaded_zip_photos is not None and uploaded_zip_cvs is not None
 
         if all_uploaded:
-            try:
-                # Extraction des ZIP
-                with zipfile.ZipFile(uploaded_zip_photos, 'r') as zip_ref:
-                    zip_ref.extractall('temp_photos')
-                with zipfile.ZipFile(uploaded_zip_cvs, 'r') as zip_ref:
-                    zip_ref.extractall('temp_cvs')
-
-                # Lecture du fichier Excel
-                xls = pd.ExcelFile(uploaded_excel)
-                data = {sheet: pd.read_excel(xls, sheet) for sheet in xls.sheet_names}
-
-                # Calcul du nombre total d'employés
-                identité = data.get("Identité", pd.DataFrame())
-                poste = data.get("Poste_et_Carrière", pd.DataFrame())
-                if not identité.empty and not poste.empty:
-                    merged_global = pd.merge(identité, poste, on="Matricule", how="inner")
-                    total_employes = len(merged_global)
-                else:
-                    total_employes = 0
-
-                st.session_state.files_loaded = True
-                st.session_state.data = data
-                st.session_state.total_employes = total_employes
-
-                st.success("✅ Tous les fichiers ont été chargés avec succès ! L'application démarre...")
-                st.rerun()
-
-            except Exception as e:
-                st.error(f"❌ Erreur lors du chargement des fichiers : {e}")
+            # Lecture et indexation dans un thread de fond : le tableau de bord s'affiche
+            # dès que les feuilles Identité et Poste_et_Carrière sont prêtes
+            if st.session_state.dataset is not None:
+                st.session_state.dataset.release()
+            st.session_state.dataset = None
+            release_assets()
+            st.session_state.prefetch_thumbs = prefetch_thumbs
+            with span("lecture des fichiers importés") as trace:
+                contents = [read_bytes(f) for f in (uploaded_excel, uploaded_zip_photos, uploaded_zip_cvs)]
+                trace["octets"] = sum(len(c) for c in contents)
+            st.session_state.load_job = LoadJob(*contents, prepare_dataset, parallel=parallel_load, persist=persist_store).start()
+            st.session_state.load_phase = PHASE_START
+            st.session_state.files_loaded = True
+            st.rerun()
         else:
             st.warning("⚠️ Veuillez charger les trois fichiers (Excel + ZIP Photos + ZIP CVs) avant de continuer.")
 
@@ -129,246 +332,201 @@ else:
     # ────────────────────────────────────────────────
     st.header("🚀 Gestion des Ressources Humaines – OMNIS")
 
-    data = st.session_state.data
-    total_employes = st.session_state.total_employes
-
-    identité    = data.get("Identité", pd.DataFrame())
-    poste       = data.get("Poste_et_Carrière", pd.DataFrame())
-    salaire     = data.get("Salaire", pd.DataFrame())
-    historique  = data.get("Historique", pd.DataFrame())
-    presences   = data.get("Présences_Absences", pd.DataFrame())
-    missions    = data.get("Missions", pd.DataFrame())
-    evaluations = data.get("Évaluations", pd.DataFrame())
-    formations  = data.get("Formations", pd.DataFrame())
-    turnover    = data.get("Turnover", pd.DataFrame())
-
-    # Recalcul au cas où (cohérence)
-    if not identité.empty and not poste.empty:
-        merged_global = pd.merge(identité, poste, on="Matricule", how="inner")
-        total_employes = len(merged_global)
-
-    # Mapping Direction → Départements
-    directions_mapping = {
-        'Direction Générale': [
-            'Conseiller DG',
-            'Direction des affaires juridiques et promotion',
-            'DGA Management',
-            'DGA Technique',
-            'Cellule environnement',
-            'Cellule audit et organisation',
-            'Cellule analyse des marchés énergie'
-        ],
-
-        'DGA Management': [
-            'Direction des ressources humaines',
-            'Direction administrative et financière',
-            'Direction du patrimoine et logistique',
-            'Direction système d’information'
-        ],
-
-        'DGA Technique': [
-            'Direction mine et forage',
-            'Direction des hydrocarbures',
-            'Direction laboratoire'
-        ],
-
-        'Direction des affaires juridiques et promotion': [
-            'AD Direction des affaires juridiques et promotion',
-            'Département stratégie',
-            'Département juridique',
-            'Département promotion',
-            'Département communication'
-        ],
-
-        'Cellule audit et organisation': [
-            'Auditeur'
-        ],
-
-        'Cellule analyse des marchés énergie': [
-            'Responsable suivi et évaluation des projets'
-        ],
-
-        'Direction des ressources humaines': [
-            'AD Direction des ressources humaines',
-            'Département Administration du personnel',
-            'Département socio-culturel et événementiel',
-            'Département Paie',
-            'Département Gestion des carrières et compétences',
-            'Département Sécurité',
-            'Cellule médecin et conseil'
-        ],
-
-        'Direction administrative et financière': [
-            'AD Direction administrative et financière',
-            'Département Analytique et budget',
-            'Département Trésorerie et finance',
-            'Département Comptabilité générale'
-        ],
-
-        'Direction du patrimoine et logistique': [
-            'AD Direction du patrimoine et logistique',
-            'Département Approvisionnements',
-            'Département Magasins généraux',
-            'Département Transport et maintenance',
-            'Département Affaires extérieures'
-        ],
-
-        'Direction système d’information': [
-            'AD Direction système d’information',
-            'Département Études',
-            'Département Administration réseaux, serveurs et architecture',
-            'Département Parc informatique et support'
-        ],
-
-        'Direction mine et forage': [
-            'AD Direction mine et forage',
-            'Département Suivi exploration minière',
-            'Département Base de données',
-            'Département Gestion du portefeuille minier',
-            'Département Forage et prestations',
-            'Département Études économiques et financières'
-        ],
-
-        'Direction des hydrocarbures': [
-            'AD Direction des hydrocarbures',
-            'Département Étude bassin Morondava',
-            'Département Étude bassin Nord et côte Est',
-            'Département Suivi HSE',
-            'Département Gestion de la base de données'
-        ],
-
-        'Direction laboratoire': [
-            'AD Direction laboratoire',
-            'Département Gestion administration et projets',
-            'Département Contrôle qualité',
-            'Département Pétrologie sédimentaire',
-            'Département Analyses',
-            'Département Géochimie physico-chimie',
-            'Département Traitement'
-        ]
-    }
+    if st.session_state.load_job is not None:
+        load_progress(st.session_state.load_job)
+        if st.session_state.dataset is None:
+            st.stop()
+
+    data = st.session_state.dataset.data
+    derived = st.session_state.dataset.derived
+    matricule_index = derived["matricule_index"]
+    search_index = derived["search_index"]
+    org_tree = derived["org_tree"]
+    org_index = derived["org_index"]
+    salary_cube = derived["salary_cube"]
+    trend_series = derived["trends"]
+
+    identité = data.get("Identité", pd.DataFrame())
+    poste = data.get("Poste_et_Carrière", pd.DataFrame())
+    turnover = data.get("Turnover", pd.DataFrame())
+
 
     tab1, tab2, tab3 = st.tabs(["📊 Tableau de bord général", "🏢 Analyse par direction", "👤 Analyse individuelle"])
 
     with tab1:
         st.header("📊 Tableau de bord général")
 
+        # Indicateurs calculés une fois par jeu de données (omnis.kpi)
+        kpis = kpis_for(st.session_state.dataset.digest, data)
+
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("👥 Total employés", total_employes)
+            st.metric("👥 Total employés", kpis["total_employes"])
         with col2:
-            if not turnover.empty:
-                taux_turn = (len(turnover) / total_employes * 100) if total_employes > 0 else 0
-                st.metric("📉 Taux de turnover", f"{taux_turn:.1f} %")
+            if kpis["taux_turnover"] is not None:
+                st.metric("📉 Taux de turnover", f"{kpis['taux_turnover']:.1f} %")
         with col3:
-            if not salaire.empty:
-                salaire["Salaire_Brut"] = pd.to_numeric(salaire["Salaire_Brut"], errors="coerce")
-                avg_brut = salaire["Salaire_Brut"].mean()
-                st.metric("💵 Salaire moyen brut", format_ar(avg_brut))
+            if kpis["salaire_moyen_brut"] is not None:
+                st.metric("💵 Salaire moyen brut", format_ar(kpis["salaire_moyen_brut"]))
         with col4:
-            if not presences.empty:
-                absent_rate = (len(presences[presences["Type"] != "Présence"]) / len(presences) * 100) if len(presences) > 0 else 0
-                st.metric("📅 Taux d'absentéisme", f"{absent_rate:.1f} %")
+            if kpis["taux_absenteisme"] is not None:
+                st.metric("📅 Taux d'absentéisme", f"{kpis['taux_absenteisme']:.1f} %")
         with col5:
-            if not identité.empty and "Sexe" in identité.columns:
-                hf = (len(identité[identité["Sexe"] == "Femme"]) / total_employes * 100) if total_employes > 0 else 0
-                st.metric("👩‍💼 Diversité H/F", f"{hf:.1f} % de femmes")
+            if kpis["pct_femmes"] is not None:
+                st.metric("👩‍💼 Diversité H/F", f"{kpis['pct_femmes']:.1f} % de femmes")
 
-        if not salaire.empty:
+        if kpis["depenses_mensuelles"] is not None:
             st.subheader("💰 Dépenses salariales totales")
-            salaire["Salaire_Brut"] = pd.to_numeric(salaire["Salaire_Brut"], errors="coerce")
-            monthly_total = salaire.groupby("Mois")["Salaire_Brut"].sum().reset_index()
-            monthly_total['Salaire_Brut'] = monthly_total['Salaire_Brut'].apply(lambda x: x / 1000000)
-            fig_bar_monthly = px.bar(monthly_total, x="Mois", y="Salaire_Brut",
-                                     title="Dépenses totales par mois (en millions Ar)")
-            fig_bar_monthly.update_traces(hovertemplate='%{x}: %{y:.2f} M Ar<extra></extra>')
-            fig_bar_monthly.update_yaxes(tickformat=".2f", title="Millions Ar")
-            st.plotly_chart(fig_bar_monthly, use_container_width=True)
-            total_global = salaire["Salaire_Brut"].sum()
-            st.metric("💵 Dépenses totales globales", format_ar(total_global))
-
-        if not identité.empty and "Sexe" in identité.columns:
+            monthly_total = kpis["depenses_mensuelles"].copy()
+            monthly_total['Salaire_Brut'] = monthly_total['Salaire_Brut'] / 1000000
+            with span("graphique : dépenses mensuelles"):
+                fig_bar_monthly = px.bar(monthly_total, x="Mois", y="Salaire_Brut",
+                                         title="Dépenses totales par mois (en millions Ar)")
+                fig_bar_monthly.update_traces(hovertemplate='%{x}: %{y:.2f} M Ar<extra></extra>')
+                fig_bar_monthly.update_yaxes(tickformat=".2f", title="Millions Ar")
+                st.plotly_chart(fig_bar_monthly, use_container_width=True)
+            st.metric("💵 Dépenses totales globales", format_ar(kpis["depenses_totales"]))
+
+        if kpis["repartition_sexe"] is not None:
             st.subheader("👥 Répartition Hommes / Femmes")
-            hf_dist = identité["Sexe"].value_counts()
-            fig_hf = px.pie(values=hf_dist.values, names=hf_dist.index, title="Répartition globale H/F")
-            st.plotly_chart(fig_hf, use_container_width=True)
+            hf_dist = kpis["repartition_sexe"]
+            with span("graphique : répartition H/F"):
+                fig_hf = px.pie(values=hf_dist.values, names=hf_dist.index, title="Répartition globale H/F")
+                st.plotly_chart(fig_hf, use_container_width=True)
 
-        if not turnover.empty:
+        if kpis["taux_turnover"] is not None:
             st.subheader("🔄 Turnover global")
-            if "Motif" in turnover.columns:
-                motif_dist = turnover["Motif"].value_counts()
-                fig_turn = px.bar(x=motif_dist.index, y=motif_dist.values, title="Motifs de départ")
-                st.plotly_chart(fig_turn, use_container_width=True)
+            if kpis["motifs_depart"] is not None:
+                motif_dist = kpis["motifs_depart"]
+                with span("graphique : motifs de départ"):
+                    fig_turn = px.bar(x=motif_dist.index, y=motif_dist.values, title="Motifs de départ")
+                    st.plotly_chart(fig_turn, use_container_width=True)
+
+        trends = trend_series.monthly()
+        if not trends.empty:
+            st.subheader("📈 Tendances mensuelles")
+            trend_charts(trends, trend_series.absence_types(), "ensemble")
 
     with tab2:
         st.header("🏢 Analyse par direction")
 
-        if "Direction" in poste.columns:
-            selected_dir = st.selectbox("Filtrer par direction", ["Tous"] + sorted(poste["Direction"].dropna().unique().tolist()))
-        else:
-            selected_dir = "Tous"
+        # Niveaux de l'organigramme (DG, DGA, directions...) et directions présentes dans les données
+        data_dirs = set(poste["Direction"].dropna().unique().tolist()) if "Direction" in poste.columns else set()
+        org_nodes = [node for node in org_tree.order if org_tree.children_of(node) or node in data_dirs]
+        selected_dir = st.selectbox("Filtrer par direction", ["Tous"] + org_nodes,
+                                    format_func=lambda n: n if n == "Tous" else "\u2003" * org_tree.depth[n] + n)
 
-        available_depts = directions_mapping.get(selected_dir, []) if selected_dir != "Tous" else sorted(poste["Département"].dropna().unique().tolist())
+        if selected_dir != "Tous":
+            available_depts = org_tree.children_of(selected_dir)
+        else:
+            available_depts = sorted(poste["Département"].dropna().unique().tolist()) if "Département" in poste.columns else []
         selected_depts = st.multiselect("Filtrer par départements (liés à la direction)", available_depts, default=[])
 
-        filtered_poste = poste.copy()
+        # Filtre sur les sous-arbres sélectionnés : tous les employés rattachés en dessous sont inclus
         if selected_dir != "Tous":
-            filtered_poste = filtered_poste[filtered_poste["Direction"] == selected_dir]
-        if selected_depts:
-            filtered_poste = filtered_poste[filtered_poste["Département"].isin(selected_depts)]
+            cube_filter = {"noeuds": selected_depts or [selected_dir]}
+        else:
+            cube_filter = {"departements": selected_depts}
+        nb_filtered = salary_cube.effectif(**cube_filter)
 
-        if not filtered_poste.empty:
-            ids_filtered = filtered_poste["Matricule"].tolist()
-            salaire_filt = salaire[salaire["Matricule"].isin(ids_filtered)] if not salaire.empty else pd.DataFrame()
+        if nb_filtered > 0:
+            summary = salary_cube.summary(**cube_filter)
 
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("👥 Employés filtrés", len(filtered_poste))
+                st.metric("👥 Employés filtrés", nb_filtered)
             with col2:
-                if not salaire_filt.empty:
-                    salaire_filt["Salaire_Brut"] = pd.to_numeric(salaire_filt["Salaire_Brut"], errors="coerce")
-                    avg_salaire = salaire_filt["Salaire_Brut"].mean()
-                    st.metric("💵 Salaire moyen", format_ar(avg_salaire))
+                if not summary["vide"]:
+                    st.metric("💵 Salaire moyen", format_ar(summary["salaire_moyen"]))
                 else:
                     st.metric("💵 Salaire moyen", "N/A")
             with col3:
-                if not salaire_filt.empty:
-                    total_salaire = salaire_filt["Salaire_Brut"].sum()
-                    st.metric("💼 Masse salariale totale", format_ar(total_salaire))
+                if not summary["vide"]:
+                    st.metric("💼 Masse salariale totale", format_ar(summary["total"]))
                 else:
                     st.metric("💼 Masse salariale totale", "N/A")
             with col4:
-                if not salaire_filt.empty and "Mois" in salaire_filt.columns:
-                    total_salaire = salaire_filt["Salaire_Brut"].sum()
-                    nb_mois = salaire_filt["Mois"].nunique()
-                    if nb_mois > 0:
-                        masse_moyenne_mois = total_salaire / nb_mois
-                        st.metric("💰 Masse salariale moyenne/mois", format_ar(masse_moyenne_mois))
-                    else:
-                        st.metric("💰 Masse salariale moyenne/mois", "N/A")
+                if not summary["vide"] and summary["nb_mois"] > 0:
+                    st.metric("💰 Masse salariale moyenne/mois", format_ar(summary["masse_moyenne_mois"]))
                 else:
                     st.metric("💰 Masse salariale moyenne/mois", "N/A")
 
-            if not salaire_filt.empty and "Mois" in salaire_filt.columns:
-                monthly_filt = salaire_filt.groupby("Mois")["Salaire_Brut"].sum().reset_index()
-                monthly_filt['Salaire_Brut'] = monthly_filt['Salaire_Brut'].apply(lambda x: x / 1000000)
-                fig_bar_filt = px.bar(monthly_filt, x="Mois", y="Salaire_Brut",
-                                      title="Dépenses salariales filtrées par mois (en millions Ar)")
-                fig_bar_filt.update_traces(hovertemplate='%{x}: %{y:.2f} M Ar<extra></extra>')
-                fig_bar_filt.update_yaxes(tickformat=".2f", title="Millions Ar")
-                st.plotly_chart(fig_bar_filt, use_container_width=True)
-
-            ident_filt = identité[identité["Matricule"].isin(ids_filtered)] if not identité.empty else pd.DataFrame()
-            if not ident_filt.empty and "Sexe" in ident_filt.columns:
-                hf_filt = ident_filt["Sexe"].value_counts()
-                fig_hf_filt = px.pie(values=hf_filt.values, names=hf_filt.index, title="Répartition H/F – Direction sélectionnée")
-                st.plotly_chart(fig_hf_filt, use_container_width=True)
-
+            # Indicateurs cumulés sur l'organigramme (calculés une fois pour chaque nœud)
+            if selected_dir != "Tous":
+                rollup = org_index.kpis(cube_filter["noeuds"])
+                col1, col2 = st.columns(2)
+                with col1:
+                    taux = rollup["taux_turnover"]
+                    st.metric("📉 Taux de turnover (cumulé)", f"{taux:.1f} %" if pd.notna(taux) else "N/A")
+                with col2:
+                    taux = rollup["taux_absenteisme"]
+                    st.metric("📅 Taux d'absentéisme (cumulé)", f"{taux:.1f} %" if pd.notna(taux) else "N/A")
+
+            if not summary["mensuel"].empty:
+                monthly_filt = summary["mensuel"]
+                monthly_filt['Salaire_Brut'] = monthly_filt['Salaire_Brut'] / 1000000
+                with span("graphique : dépenses filtrées"):
+                    fig_bar_filt = px.bar(monthly_filt, x="Mois", y="Salaire_Brut",
+                                          title="Dépenses salariales filtrées par mois (en millions Ar)")
+                    fig_bar_filt.update_traces(hovertemplate='%{x}: %{y:.2f} M Ar<extra></extra>')
+                    fig_bar_filt.update_yaxes(tickformat=".2f", title="Millions Ar")
+                    st.plotly_chart(fig_bar_filt, use_container_width=True)
+
+            hf_filt = salary_cube.repartition_sexe(**cube_filter)
+            if not hf_filt.empty:
+                with span("graphique : répartition H/F filtrée"):
+                    fig_hf_filt = px.pie(values=hf_filt.values, names=hf_filt.index, title="Répartition H/F – Direction sélectionnée")
+                    st.plotly_chart(fig_hf_filt, use_container_width=True)
+
+            ids_filtered = salary_cube.matricules(**cube_filter)
             turnover_filt = turnover[turnover["Matricule"].isin(ids_filtered)] if not turnover.empty else pd.DataFrame()
             if not turnover_filt.empty and "Motif" in turnover_filt.columns:
                 motif_filt = turnover_filt["Motif"].value_counts()
-                fig_turn_filt = px.bar(x=motif_filt.index, y=motif_filt.values, title="Motifs de départ – Direction sélectionnée")
-                st.plotly_chart(fig_turn_filt, use_container_width=True)
+                motif_filt = motif_filt[motif_filt > 0]
+                with span("graphique : motifs de départ filtrés"):
+                    fig_turn_filt = px.bar(x=motif_filt.index, y=motif_filt.values, title="Motifs de départ – Direction sélectionnée")
+                    st.plotly_chart(fig_turn_filt, use_container_width=True)
+
+            trends_filt = trend_series.monthly(**cube_filter)
+            if not trends_filt.empty:
+                st.subheader("📈 Tendances mensuelles – sélection")
+                trend_charts(trends_filt, trend_series.absence_types(**cube_filter), "sélection")
+
+            # Export groupé de la sélection : un rapport par direction, un dossier par employé
+            with st.expander("📦 Export groupé (rapports et dossiers)"):
+                if "noeuds" in cube_filter:
+                    export_roots = cube_filter["noeuds"]
+                else:
+                    export_roots = [d for d in selected_depts if d in org_tree] or [org_tree.root]
+                export_nodes = list(dict.fromkeys(n for root in export_roots for n in report_nodes(org_tree, root)))
+                st.caption(f"{len(export_nodes)} rapport(s) de direction")
+                with_dossiers = st.checkbox(f"Inclure les dossiers individuels ({nb_filtered} employés)", value=True)
+                with_assets = st.checkbox("Joindre les photos et CV", value=True, disabled=not with_dossiers)
+                parallel_export = st.checkbox("Générer en parallèle (plusieurs processus)", value=True)
+                if st.button("Générer l'archive"):
+                    # Une seule archive par session : la précédente est supprimée
+                    previous = st.session_state.export_result
+                    if previous is not None and os.path.exists(previous["chemin"]):
+                        os.remove(previous["chemin"])
+                    st.session_state.export_result = None
+                    bar = st.progress(0.0, text="Export en cours...")
+                    label = selected_dir if selected_dir != "Tous" else "tous"
+                    path = os.path.join(EXPORT_DIR, f"export_{safe_name(label)}_{datetime.now():%Y%m%d_%H%M%S}.zip")
+                    try:
+                        st.session_state.export_result = export_bundle(
+                            path, data, export_nodes, ids_filtered if with_dossiers else [], structures=derived,
+                            photos=st.session_state.photos if with_assets else None,
+                            cvs=st.session_state.cvs if with_assets else None, parallel=parallel_export,
+                            progress=lambda done, total, detail: bar.progress(done / total, text=f"{done} / {total} – {detail}"))
+                    except Exception as e:
+                        st.error(f"Erreur lors de l'export : {e}")
+                result = st.session_state.export_result
+                if result is not None and os.path.exists(result["chemin"]):
+                    st.success(f"{result['rapports']} rapports, {result['dossiers']} dossiers, {result['photos']} photos et "
+                               f"{result['cvs']} CV en {result['secondes']:.1f} s ({result['octets'] / 1024**2:.1f} Mo) – {result['chemin']}")
+                    with open(result["chemin"], "rb") as archive:
+                        st.download_button("💾 Télécharger l'archive", archive, file_name=os.path.basename(result["chemin"]),
+                                           mime="application/zip")
         else:
             st.warning("Aucun employé ne correspond aux filtres appliqués.")
 
@@ -376,24 +534,23 @@ else:
         st.header("👤 Analyse individuelle")
 
         search_term = st.text_input("🔍 Rechercher par matricule ou nom")
+        search_fields = st.multiselect("Champs de recherche", FIELD_ORDER, default=DEFAULT_FIELDS)
         selected_id = None
-        if search_term and not identité.empty:
-            mask_id = identité["Matricule"].astype(str).str.contains(search_term, case=False, na=False)
-            mask_nom = identité["Nom"].str.contains(search_term, case=False, na=False)
-            filtered = identité[mask_id | mask_nom]
-            if not filtered.empty:
-                selected_id = st.selectbox("Choisir un matricule", filtered["Matricule"].tolist())
+        if search_term and search_index is not None:
+            matches = search_index.search(search_term, k=50, fields=search_fields)
+            if matches:
+                selected_id = st.selectbox("Choisir un matricule", matches,
+                                           format_func=lambda m: f"{m} – {search_index.label(m)}")
 
         if selected_id:
-            emp_poste = poste[poste["Matricule"] == selected_id]
-            emp_ident = identité[identité["Matricule"] == selected_id]
-            emp_data = {k: v[v["Matricule"] == selected_id] for k, v in data.items() if "Matricule" in v.columns}
+            emp_data = employee_slices(data, matricule_index, selected_id)
+            emp_poste = emp_data.get("Poste_et_Carrière", pd.DataFrame())
+            emp_ident = emp_data.get("Identité", pd.DataFrame())
 
             st.subheader("🖼️ Photo d’identité")
-            photo_path = f"temp_photos/photo_{selected_id}.jpg"
-            if os.path.exists(photo_path):
-                image = Image.open(photo_path)
-                st.image(image, caption=f"Photo – Matricule {selected_id}", width=200)
+            thumbnail = st.session_state.thumbnails.get(selected_id) if st.session_state.thumbnails is not None else None
+            if thumbnail is not None:
+                st.image(thumbnail, caption=f"Photo – Matricule {selected_id}", width=200)
             else:
                 st.warning("⚠️ Aucune photo trouvée pour ce matricule. Vérifiez le contenu du ZIP.")
 
@@ -416,7 +573,6 @@ else:
                     st.write(f"**Compétences clés :** {row_ident.get('Compétences_clés', 'N/A')}")
                     if "Salaire" in emp_data and not emp_data["Salaire"].empty and "Mois" in emp_data["Salaire"].columns:
                         emp_salaire = emp_data["Salaire"]
-                        emp_salaire["Salaire_Brut"] = pd.to_numeric(emp_salaire["Salaire_Brut"], errors="coerce")
                         total_salaire_emp = emp_salaire["Salaire_Brut"].sum()
                         nb_mois_emp = emp_salaire["Mois"].nunique()
                         if nb_mois_emp > 0:
@@ -427,27 +583,24 @@ else:
                     else:
                         st.write("**💵 Salaire moyen par mois :** N/A")
 
-                cv_path = f"temp_cvs/cv_{selected_id}.pdf"
-                if os.path.exists(cv_path):
-                    with open(cv_path, "rb") as file:
-                        st.download_button(
-                            label=f"📄 Voir / Télécharger le CV (Matricule {selected_id})",
-                            data=file.read(),
-                            file_name=f"cv_{selected_id}.pdf",
-                            mime="application/pdf"
-                        )
+                cv_bytes = st.session_state.cvs.read(cv_name(selected_id)) if st.session_state.cvs is not None else None
+                if cv_bytes is not None:
+                    st.download_button(
+                        label=f"📄 Voir / Télécharger le CV (Matricule {selected_id})",
+                        data=cv_bytes,
+                        file_name=cv_name(selected_id),
+                        mime="application/pdf"
+                    )
                 else:
                     st.warning("⚠️ Aucun CV trouvé pour ce matricule. Vérifiez le contenu du ZIP CVs.")
 
             if "Évaluations" in emp_data and not emp_data["Évaluations"].empty:
                 st.subheader("📊 Évaluations annuelles")
-                df_eval_formatted = format_df(emp_data["Évaluations"])
-                st.dataframe(df_eval_formatted, use_container_width=True)
+                paged_table(emp_data["Évaluations"], f"eval_{selected_id}")
 
             if "Formations" in emp_data and not emp_data["Formations"].empty:
                 st.subheader("🎓 Formations")
-                df_form_formatted = format_df(emp_data["Formations"])
-                st.dataframe(df_form_formatted, use_container_width=True)
+                paged_table(emp_data["Formations"], f"form_{selected_id}")
 
             if "Missions" in emp_data and not emp_data["Missions"].empty:
                 st.subheader("🎯 Missions")
@@ -461,23 +614,39 @@ else:
 
             if "Présences_Absences" in emp_data and not emp_data["Présences_Absences"].empty:
                 st.subheader("📅 Présences / Absences")
-                df_abs = emp_data["Présences_Absences"].head(10)
-                df_abs_formatted = format_df(df_abs)
+                df_abs = emp_data["Présences_Absences"]
                 if "Congé_restant" in df_abs.columns:
                     st.write(f"**Congés restants :** {df_abs['Congé_restant'].iloc[0]} jours")
-                st.dataframe(df_abs_formatted, use_container_width=True)
+                # Résumé sur toutes les lignes de l'employé, pas seulement la page affichée
+                abs_monthly = absences_par_mois(df_abs)
+                if not abs_monthly.empty:
+                    with span("graphique : absences par mois"):
+                        fig_abs = px.bar(abs_monthly, x=abs_monthly.index, y=list(abs_monthly.columns),
+                                         title="Jours d'absence par mois", labels={"x": "Mois", "value": "Jours", "variable": "Type"})
+                        st.plotly_chart(fig_abs, use_container_width=True)
+                paged_table(df_abs, f"abs_{selected_id}")
 
             if "Historique" in emp_data and not emp_data["Historique"].empty:
                 st.subheader("📈 Historique complet (sanctions, bonus, évolutions, etc.)")
-                df_hist_formatted = format_df(emp_data["Historique"])
-                st.dataframe(df_hist_formatted, use_container_width=True)
-
-    if st.button("🗑️ Supprimer les dossiers temporaires (photos & CV)"):
-        if os.path.exists('temp_photos'):
-            shutil.rmtree('temp_photos')
-        if os.path.exists('temp_cvs'):
-            shutil.rmtree('temp_cvs')
-        st.success("Dossiers temporaires supprimés avec succès.")
+                hist_totals = totaux_historique(emp_data["Historique"])
+                if not hist_totals.empty:
+                    st.dataframe(format_df(hist_totals), use_container_width=True, hide_index=True)
+                paged_table(emp_data["Historique"], f"hist_{selected_id}")
+
+# Panneau de mesures : synthèse par étape, mémoire des feuilles et export JSON des traces
+tracer = current()
+if tracer is not None:
+    tracer.record("exécution du script", time.perf_counter() - run_started)
+    with st.sidebar.expander("🩺 Détail des mesures", expanded=True):
+        st.dataframe(tracer.summary(), hide_index=True, use_container_width=True)
+        if st.session_state.dataset is not None:
+            tracer.record_frames(st.session_state.dataset.digest, st.session_state.dataset.data)
+            frames = pd.DataFrame.from_dict(tracer.frames[st.session_state.dataset.digest], orient="index")
+            frames["Mo"] = frames.pop("octets") / 1024**2
+            st.dataframe(frames, use_container_width=True)
+        st.download_button("💾 Exporter les traces (JSON)", tracer.to_json(), file_name="traces_omnis.json", mime="application/json")
+        if st.button("Effacer les mesures"):
+            tracer.clear()
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,58 @@
+# Benchmark : mise en forme cellule par cellule (apply) vs formatage vectorisé.
+# Usage : python -m benchmarks.bench_formatting [nombre_de_cellules]
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from omnis.formatting import format_ar, format_df, format_french_date
+
+MONETARY_KEYWORDS = ["salaire", "bonus", "montant", "prime", "indemnité", "sanction", "coût", "cout", "depense", "dépense"]
+DATE_KEYWORDS = ["date", "naissance", "debut", "fin", "mois", "annee", "année"]
+
+
+# Référence : l'ancienne mise en forme, colonne par colonne et cellule par cellule
+def format_df_per_cell(df):
+    df_formatted = df.copy()
+    for col in df_formatted.columns:
+        if any(keyword in col.lower() for keyword in MONETARY_KEYWORDS):
+            df_formatted[col] = pd.to_numeric(df_formatted[col], errors='coerce').apply(format_ar)
+    for col in df_formatted.columns:
+        if any(keyword in col.lower() for keyword in DATE_KEYWORDS) or pd.api.types.is_datetime64_any_dtype(df[col]):
+            df_formatted[col] = df_formatted[col].apply(format_french_date)
+    return df_formatted
+
+
+# Tableau type Historique : montants entiers, montants décimaux, dates et dates texte
+def make_frame(n_cells):
+    rows = n_cells // 4
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D")
+    montant = rng.integers(-2_000_000, 5_000_000, rows).astype(float)
+    montant[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        "Montant": montant,
+        "Salaire_Brut": np.round(rng.uniform(3e5, 9e6, rows), 2),
+        "Date": dates,
+        "Date_Fin": dates.strftime("%Y-%m-%d"),
+    })
+
+
+def main():
+    n_cells = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = make_frame(n_cells)
+    start = time.perf_counter()
+    reference = format_df_per_cell(df)
+    per_cell = time.perf_counter() - start
+    start = time.perf_counter()
+    result = format_df(df)
+    vectorized = time.perf_counter() - start
+    identical = reference.equals(result)
+    print(f"{df.size} cellules")
+    print(f"cellule par cellule : {per_cell:.2f} s")
+    print(f"vectorisé           : {vectorized:.2f} s  (x{per_cell / vectorized:.1f}, résultat identique : {identical})")
+
+
+if __name__ == "__main__":
+    main()
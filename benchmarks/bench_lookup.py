@@ -0,0 +1,39 @@
+# Microbenchmark : recherche des lignes d'un employé, balayage booléen vs index.
+# Usage : python -m benchmarks.bench_lookup
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from omnis.index import build_matricule_index, employee_slices
+
+SIZES = [10_000, 100_000, 1_000_000]
+ROWS_PER_EMPLOYEE = 12
+
+
+def make_sheet(n_rows):
+    rng = np.random.default_rng(0)
+    n_emp = max(1, n_rows // ROWS_PER_EMPLOYEE)
+    return pd.DataFrame({
+        "Matricule": rng.integers(1000, 1000 + n_emp, n_rows),
+        "Mois": rng.integers(1, 13, n_rows),
+        "Salaire_Brut": rng.uniform(5e5, 3e6, n_rows),
+    })
+
+
+def main():
+    print(f"{'lignes':>10} {'balayage (ms)':>15} {'index (ms)':>12} {'construction (ms)':>18}")
+    for n_rows in SIZES:
+        data = {"Salaire": make_sheet(n_rows)}
+        df = data["Salaire"]
+        matricule = int(df["Matricule"].iloc[n_rows // 2])
+        repeat = 20
+        scan = timeit.timeit(lambda: df[df["Matricule"] == matricule], number=repeat) / repeat
+        build = timeit.timeit(lambda: build_matricule_index(data), number=1)
+        index = build_matricule_index(data)
+        lookup = timeit.timeit(lambda: employee_slices(data, index, matricule), number=repeat) / repeat
+        print(f"{n_rows:>10} {scan * 1e3:>15.3f} {lookup * 1e3:>12.3f} {build * 1e3:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
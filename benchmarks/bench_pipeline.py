@@ -0,0 +1,98 @@
+# Benchmark de bout en bout sur des classeurs fictifs (omnis.synthetic) :
+# lecture, typage, structures (dont séries mensuelles), indicateurs, filtre par
+# direction, fiche employé, recherche et mise en forme, pour plusieurs tailles d'effectif.
+# Usage : python -m benchmarks.bench_pipeline [--tailles 1000 10000 100000] [--mois 6]
+#                                             [--sans-excel] [--json resultats.json]
+import argparse
+import json
+import time
+
+import numpy as np
+
+from omnis.cache import parse_workbook
+from omnis.cube import SalaryCube
+from omnis.formatting import format_df
+from omnis.index import build_matricule_index, employee_slices
+from omnis.kpi import compute_kpis
+from omnis.organisation import OrgIndex, OrgTree
+from omnis.schema import normalize_dataset
+from omnis.search import SearchIndex
+from omnis.synthetic import generate_dataset, workbook_bytes
+from omnis.timeseries import TrendSeries
+
+SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 200
+QUERIES = ["Rakoto", "rasoa12", "10042", "Hery", "ndria", "Ingénieur"]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+# Durées (secondes) de chaque étape pour un effectif donné
+def run(n_employes, n_mois, excel=True):
+    timings = {}
+    raw = generate_dataset(n_employes, n_mois, pointages_par_mois=1)
+    if excel:
+        content = workbook_bytes(raw)
+        (raw, _), timings["lecture classeur"] = _timed(lambda: parse_workbook(content))
+    (data, _), timings["typage"] = _timed(lambda: normalize_dataset(raw))
+
+    identité, poste = data["Identité"], data["Poste_et_Carrière"]
+    index, timings["index matricule"] = _timed(lambda: build_matricule_index(data))
+    search_index, timings["index recherche"] = _timed(lambda: SearchIndex(identité, poste))
+    tree, timings["organigramme"] = _timed(lambda: OrgTree(poste=poste))
+    org_index, timings["cumuls organigramme"] = _timed(
+        lambda: OrgIndex(tree, poste, data["Salaire"], data["Présences_Absences"], data["Turnover"]))
+    cube, timings["cube salarial"] = _timed(lambda: SalaryCube(poste, data["Salaire"], identité, tree))
+    trends, timings["séries mensuelles"] = _timed(
+        lambda: TrendSeries(poste, data["Salaire"], data["Présences_Absences"], data["Turnover"], tree))
+    _, timings["indicateurs"] = _timed(lambda: compute_kpis(data))
+
+    # Filtre par direction : moyenne sur tous les nœuds de l'organigramme
+    def filter_all():
+        for node in tree.order:
+            cube.summary(noeuds=[node])
+            org_index.kpis(node)
+            trends.monthly(noeuds=[node])
+    _, total = _timed(filter_all)
+    timings["filtre direction (par nœud)"] = total / len(tree.order)
+
+    rng = np.random.default_rng(0)
+    matricules = rng.choice(identité["Matricule"].to_numpy(), LOOKUPS)
+    _, total = _timed(lambda: [employee_slices(data, index, m) for m in matricules])
+    timings["fiche employé (par fiche)"] = total / LOOKUPS
+
+    _, total = _timed(lambda: [search_index.search(q) for q in QUERIES])
+    timings["recherche (par requête)"] = total / len(QUERIES)
+
+    _, timings["mise en forme Historique"] = _timed(lambda: format_df(data["Historique"]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_pipeline",
+                                     description="Benchmark de bout en bout sur des jeux de données RH fictifs")
+    parser.add_argument("--tailles", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--mois", type=int, default=6, help="Mois d'historique (Salaire, Présences)")
+    parser.add_argument("--sans-excel", action="store_true", help="Ne pas mesurer la lecture du classeur .xlsx")
+    parser.add_argument("--json", help="Enregistrer les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    results = {}
+    for n in args.tailles:
+        results[n] = run(n, args.mois, excel=not args.sans_excel)
+
+    steps = list(next(iter(results.values())))
+    print(f"{'étape':<30}" + "".join(f"{n:>14,}".replace(",", " ") for n in results))
+    for step in steps:
+        print(f"{step:<30}" + "".join(f"{results[n][step] * 1e3:>11.2f} ms" for n in results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({str(n): r for n, r in results.items()}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Briques de traitement de l'application RH OMNIS, indépendantes de Streamlit
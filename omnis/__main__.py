@@ -0,0 +1,125 @@
+# Ligne de commande : python -m omnis <commande> ...
+import argparse
+import json
+import sys
+
+from omnis.assets import ZipAssetStore
+from omnis.cache import load_workbook, read_bytes
+from omnis.export import build_structures, export_bundle, report_nodes
+from omnis.ingest import NATURAL_KEYS, merged_digest, prepare_delta, read_delta
+from omnis.kpi import compute_kpis, kpis_to_dict
+from omnis.schema import normalize_dataset
+from omnis.store import STORE
+from omnis.synthetic import generate_files
+
+
+def cmd_kpi(args):
+    digest, data, _ = load_workbook(args.classeur, parallel=args.parallele)
+    data, _ = normalize_dataset(data)
+    result = kpis_to_dict(compute_kpis(data))
+    result["empreinte"] = digest
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+def cmd_stocker(args):
+    digest, data, _ = load_workbook(args.classeur, parallel=args.parallele)
+    data, _ = normalize_dataset(data)
+    photos = read_bytes(args.photos) if args.photos else None
+    cvs = read_bytes(args.cvs) if args.cvs else None
+    STORE.save(digest, data, photos, cvs)
+    print(f"{len(data)} feuilles enregistrées dans {STORE.path} (empreinte {digest[:12]})")
+
+
+# Ajout d'un delta mensuel directement dans le stockage local (coût proportionnel au delta)
+def cmd_ajouter(args):
+    meta = STORE.meta()
+    if meta is None:
+        sys.exit("Aucun jeu de données enregistré : utilisez d'abord la commande « stocker ».")
+    delta_digest, frames = read_delta(args.fichier, sheet=args.feuille)
+    prepared, ignored = prepare_delta(frames)
+    STORE.append(merged_digest(meta["digest"], delta_digest), {sheet: {"ajoutees": df} for sheet, df in prepared.items()}, NATURAL_KEYS)
+    for sheet, df in prepared.items():
+        print(f"{sheet} : {len(df)} lignes ajoutées ou remplacées")
+    for sheet in ignored:
+        print(f"{sheet} : feuille ignorée")
+
+
+# Rapports par direction et dossiers des employés d'un nœud de l'organigramme
+def cmd_exporter(args):
+    _, data, _ = load_workbook(args.classeur, parallel=args.parallele)
+    data, _ = normalize_dataset(data)
+    structures = build_structures(data)
+    tree = structures["salary_cube"].org_tree
+    node = args.direction or tree.root
+    if node not in tree:
+        sys.exit(f"Nœud inconnu dans l'organigramme : {node}")
+    matricules = [] if args.sans_dossiers else structures["salary_cube"].matricules(noeuds=[node])
+    photos = ZipAssetStore(args.photos) if args.photos else None
+    cvs = ZipAssetStore(args.cvs) if args.cvs else None
+    result = export_bundle(args.sortie, data, report_nodes(tree, node), matricules, structures, photos, cvs,
+                           parallel=not args.sequentiel, max_workers=args.processus,
+                           progress=lambda done, total, _: print(f"\r{done} / {total}", end="", file=sys.stderr))
+    print(file=sys.stderr)
+    print(f"{result['rapports']} rapports, {result['dossiers']} dossiers, {result['photos']} photos, {result['cvs']} CV "
+          f"→ {result['chemin']} ({result['secondes']:.1f} s)")
+
+
+def cmd_generer(args):
+    paths = generate_files(args.dossier, args.employes, args.mois, args.debut, args.pointages, args.part_fichiers, args.graine)
+    for path in paths.values():
+        print(path)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m omnis", description="Outils en ligne de commande RH OMNIS")
+    commands = parser.add_subparsers(dest="commande", required=True)
+
+    kpi = commands.add_parser("kpi", help="Afficher les indicateurs du tableau de bord au format JSON")
+    kpi.add_argument("classeur", help="Fichier Excel RH (.xlsx)")
+    kpi.add_argument("--parallele", action="store_true", help="Lire les feuilles en parallèle")
+    kpi.set_defaults(func=cmd_kpi)
+
+    stocker = commands.add_parser("stocker", help="Enregistrer un classeur (et ses ZIP) dans le stockage local")
+    stocker.add_argument("classeur", help="Fichier Excel RH (.xlsx)")
+    stocker.add_argument("--photos", help="ZIP des photos")
+    stocker.add_argument("--cvs", help="ZIP des CV")
+    stocker.add_argument("--parallele", action="store_true", help="Lire les feuilles en parallèle")
+    stocker.set_defaults(func=cmd_stocker)
+
+    ajouter = commands.add_parser("ajouter", help="Ajouter un delta mensuel (classeur ou CSV) au stockage local")
+    ajouter.add_argument("fichier", help="Classeur (.xlsx) ou CSV des nouvelles lignes")
+    ajouter.add_argument("--feuille", choices=list(NATURAL_KEYS), help="Feuille concernée par un CSV (défaut : nom du fichier)")
+    ajouter.set_defaults(func=cmd_ajouter)
+
+    exporter = commands.add_parser("exporter", help="Exporter les rapports par direction et les dossiers des employés (ZIP)")
+    exporter.add_argument("classeur", help="Fichier Excel RH (.xlsx)")
+    exporter.add_argument("sortie", help="Archive ZIP à écrire")
+    exporter.add_argument("--direction", help="Nœud de l'organigramme à exporter (défaut : toute l'organisation)")
+    exporter.add_argument("--photos", help="ZIP des photos")
+    exporter.add_argument("--cvs", help="ZIP des CV")
+    exporter.add_argument("--sans-dossiers", action="store_true", help="Rapports de direction uniquement")
+    exporter.add_argument("--sequentiel", action="store_true", help="Ne pas utiliser de pool de processus")
+    exporter.add_argument("--processus", type=int, help="Nombre de processus (défaut : nombre de cœurs)")
+    exporter.add_argument("--parallele", action="store_true", help="Lire les feuilles en parallèle")
+    exporter.set_defaults(func=cmd_exporter)
+
+    generer = commands.add_parser("generer", help="Générer un classeur fictif et ses ZIP (tests de charge, démonstrations)")
+    generer.add_argument("dossier", help="Dossier de sortie (rh.xlsx, photos.zip, cvs.zip)")
+    generer.add_argument("--employes", type=int, default=1000, help="Nombre d'employés")
+    generer.add_argument("--mois", type=int, default=12, help="Mois d'historique")
+    generer.add_argument("--debut", default="2024-01", help="Premier mois (AAAA-MM)")
+    generer.add_argument("--pointages", type=int, default=2, help="Lignes de présence par employé et par mois")
+    generer.add_argument("--part-fichiers", type=float, default=1.0, help="Part des employés ayant photo et CV")
+    generer.add_argument("--graine", type=int, default=0, help="Graine aléatoire")
+    generer.set_defaults(func=cmd_generer)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
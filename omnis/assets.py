@@ -0,0 +1,55 @@
+# Accès paresseux aux photos et CV contenus dans les ZIP importés.
+# Le répertoire central du ZIP est indexé une seule fois ; un fichier n'est
+# décompressé que lorsqu'un onglet le demande, sans rien écrire sur le disque.
+import io
+import os
+import posixpath
+import threading
+import zipfile
+
+from omnis.instrument import span
+
+
+class ZipAssetStore:
+    # `source` : chemin (le ZIP est lu sur le disque à la demande), octets ou fichier ouvert
+    def __init__(self, source):
+        with span("indexation ZIP") as trace:
+            if isinstance(source, (bytes, bytearray)):
+                source = io.BytesIO(source)
+            elif not isinstance(source, (str, os.PathLike)):
+                source.seek(0)
+            self._zip = zipfile.ZipFile(source)
+            self._lock = threading.Lock()
+            # Index nom de fichier (sans dossier, en minuscules) → entrée du ZIP
+            self.index = {}
+            for info in self._zip.infolist():
+                if info.is_dir():
+                    continue
+                self.index.setdefault(posixpath.basename(info.filename).lower(), info)
+            trace["rows"] = len(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, name):
+        return name.lower() in self.index
+
+    # Lecture d'un seul fichier du ZIP ; renvoie None s'il est absent
+    def read(self, name):
+        info = self.index.get(name.lower())
+        if info is None:
+            return None
+        with self._lock:
+            return self._zip.read(info)
+
+    def close(self):
+        self._zip.close()
+
+
+# Noms de fichiers attendus dans les ZIP pour un matricule donné
+def photo_name(matricule):
+    return f"photo_{matricule}.jpg"
+
+
+def cv_name(matricule):
+    return f"cv_{matricule}.pdf"
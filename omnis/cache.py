@@ -0,0 +1,175 @@
+# Cache disque des classeurs RH, indexé par l'empreinte du fichier importé.
+# Chaque feuille est stockée au format Parquet (colonnaire) afin qu'un même
+# classeur ne soit lu via openpyxl qu'une seule fois, toutes sessions confondues.
+import hashlib
+import io
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from omnis.instrument import frame_rows, record_timings, traced
+from omnis.loader import parse_workbook_parallel
+
+CACHE_DIR = os.environ.get("OMNIS_RH_CACHE_DIR", ".cache_rh")
+MAX_CACHE_BYTES = int(os.environ.get("OMNIS_RH_CACHE_MAX_MB", "512")) * 1024 * 1024
+MANIFEST = "manifest.json"
+
+
+# Fonction pour lire le contenu brut d'un fichier importé (UploadedFile, chemin ou bytes)
+def read_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+
+# Empreinte SHA-256 du contenu : deux imports identiques partagent la même entrée
+def hash_bytes(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def _entry_dir(digest, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, digest)
+
+
+# Lecture d'un classeur depuis le cache ; renvoie None si absent ou incomplet
+def read_cached(digest, cache_dir=None):
+    entry = _entry_dir(digest, cache_dir)
+    manifest_path = os.path.join(entry, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        data = {}
+        for sheet in manifest["sheets"]:
+            path = os.path.join(entry, sheet["file"])
+            if sheet["format"] == "parquet":
+                data[sheet["name"]] = pd.read_parquet(path)
+            else:
+                data[sheet["name"]] = pd.read_pickle(path)
+    except (OSError, ValueError, KeyError):
+        # Entrée corrompue : on la supprime pour forcer une relecture du classeur
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+    # La date de modification du manifeste sert d'horodatage LRU pour l'éviction
+    os.utime(manifest_path)
+    return data
+
+
+# Écriture d'un classeur dans le cache (un fichier par feuille + manifeste)
+def write_cached(digest, data, cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    entry = _entry_dir(digest, cache_dir)
+    if os.path.exists(os.path.join(entry, MANIFEST)):
+        return
+    tmp = f"{entry}.tmp-{os.getpid()}-{time.time_ns()}"
+    os.makedirs(tmp)
+    sheets = []
+    try:
+        for i, (name, df) in enumerate(data.items()):
+            # Parquet si possible ; repli sur pickle pour les colonnes de types mixtes
+            # ou les en-têtes non textuels qu'Arrow refuse
+            try:
+                filename = f"{i:03d}.parquet"
+                df.to_parquet(os.path.join(tmp, filename), index=False)
+                fmt = "parquet"
+            except (ImportError, ValueError, TypeError, NotImplementedError):
+                filename = f"{i:03d}.pkl"
+                df.to_pickle(os.path.join(tmp, filename))
+                fmt = "pickle"
+            sheets.append({"name": name, "file": filename, "format": fmt})
+        with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({"sheets": sheets, "created": time.time()}, f, ensure_ascii=False)
+        os.replace(tmp, entry)
+    except OSError:
+        # Une autre session a pu écrire la même entrée en parallèle
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(entry, MANIFEST)):
+            raise
+
+
+# Lecture complète d'un classeur Excel, feuille par feuille (chemin séquentiel)
+def parse_workbook(content):
+    xls = pd.ExcelFile(io.BytesIO(content))
+    data, timings = {}, {}
+    for sheet in xls.sheet_names:
+        start = time.perf_counter()
+        data[sheet] = pd.read_excel(xls, sheet)
+        timings[sheet] = {"seconds": time.perf_counter() - start, "rows": len(data[sheet]), "engine": "openpyxl"}
+    return data, timings
+
+
+# Point d'entrée : renvoie (empreinte, données, infos de chargement)
+# `parallel=True` lit les feuilles dans un pool de processus (voir omnis.loader)
+@traced("chargement classeur", rows=lambda result: frame_rows(result[1]))
+def load_workbook(source, cache_dir=None, parallel=False, digest=None):
+    content = read_bytes(source)
+    digest = digest or hash_bytes(content)
+    start = time.perf_counter()
+    data = read_cached(digest, cache_dir)
+    if data is not None:
+        return digest, data, {"from_cache": True, "seconds": time.perf_counter() - start, "timings": {}}
+    if parallel:
+        data, timings = parse_workbook_parallel(content)
+    else:
+        data, timings = parse_workbook(content)
+    record_timings(timings)
+    write_cached(digest, data, cache_dir)
+    evict_cache(cache_dir=cache_dir)
+    return digest, data, {"from_cache": False, "seconds": time.perf_counter() - start, "timings": timings}
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+# Liste des entrées du cache : (empreinte, taille en octets, dernier accès)
+def cache_entries(cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for digest in os.listdir(cache_dir):
+        manifest_path = os.path.join(cache_dir, digest, MANIFEST)
+        if os.path.exists(manifest_path):
+            entries.append((digest, _dir_size(os.path.join(cache_dir, digest)), os.path.getmtime(manifest_path)))
+    return entries
+
+
+# Éviction LRU : supprime les entrées les moins récemment lues au-delà du plafond
+def evict_cache(max_bytes=None, cache_dir=None):
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    entries = sorted(cache_entries(cache_dir), key=lambda e: e[2])
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for digest, size, _ in entries:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(_entry_dir(digest, cache_dir), ignore_errors=True)
+        total -= size
+        removed.append(digest)
+    return removed
+
+
+# Invalidation : une entrée précise, ou tout le cache si aucune empreinte n'est donnée
+def invalidate_cache(digest=None, cache_dir=None):
+    if digest is not None:
+        shutil.rmtree(_entry_dir(digest, cache_dir), ignore_errors=True)
+    else:
+        shutil.rmtree(cache_dir or CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,122 @@
+# Cube pré-agrégé Direction × Département × Mois pour l'onglet « Analyse par direction ».
+# Construit une seule fois par jeu de données ; chaque changement de filtre ne fait
+# plus que sommer quelques cellules au lieu de rebalayer toutes les lignes de paie.
+import copy
+
+import pandas as pd
+
+from omnis.instrument import traced
+
+CELL_KEYS = ["Direction", "Département", "Mois"]
+HEADCOUNT_KEYS = ["Direction", "Département", "Sexe"]
+
+
+# Rattachement de chaque matricule à sa direction et son département
+def employee_mapping(poste):
+    columns = [c for c in ["Matricule", "Direction", "Département"] if c in poste.columns]
+    mapping = poste[columns].drop_duplicates("Matricule")
+    for column in ["Direction", "Département"]:
+        if column not in mapping.columns:
+            mapping[column] = pd.NA
+    return mapping
+
+
+# Masque de sélection des cellules d'un tableau agrégé (colonnes Direction, Département
+# et, avec un organigramme, Noeud) ; `noeuds` restreint aux sous-arbres de ces nœuds
+def cell_mask(frame, org_tree=None, direction=None, departements=None, noeuds=None):
+    mask = pd.Series(True, index=frame.index)
+    if direction is not None:
+        mask &= frame["Direction"] == direction
+    if departements:
+        mask &= frame["Département"].isin(departements)
+    if noeuds:
+        mask &= org_tree.within(frame["Noeud"].to_numpy(), noeuds)
+    return mask
+
+
+class SalaryCube:
+    # `org_tree` (omnis.organisation.OrgTree) ajoute la position de chaque cellule dans
+    # l'organigramme, pour filtrer sur un sous-arbre entier
+    def __init__(self, poste, salaire, identité=None, org_tree=None):
+        mapping = employee_mapping(poste) if "Matricule" in poste.columns else pd.DataFrame(columns=["Matricule", "Direction", "Département"])
+        self.org_tree = org_tree
+        extra_keys = []
+        if org_tree is not None:
+            mapping["Noeud"] = org_tree.positions(mapping)
+            extra_keys = ["Noeud"]
+        self.mapping = mapping
+        self.cell_keys = CELL_KEYS + extra_keys
+        self.cells = self._build_cells(salaire)
+
+        # Effectifs par sexe
+        staff = mapping.copy()
+        if identité is not None and {"Matricule", "Sexe"} <= set(identité.columns):
+            sexe = identité.drop_duplicates("Matricule").set_index("Matricule")["Sexe"]
+            staff["Sexe"] = staff["Matricule"].map(sexe)
+        else:
+            staff["Sexe"] = pd.NA
+        self.headcount = staff.groupby(HEADCOUNT_KEYS + extra_keys, dropna=False, observed=True).size().rename("effectif").reset_index()
+
+    # Cellules de paie : somme, nombre de salaires et employés distincts
+    def _build_cells(self, salaire):
+        if salaire.empty or not {"Matricule", "Mois", "Salaire_Brut"} <= set(salaire.columns):
+            return pd.DataFrame(columns=self.cell_keys + ["total", "nb_salaires", "nb_employes"])
+        rows = salaire[["Matricule", "Mois", "Salaire_Brut"]].assign(
+            Salaire_Brut=pd.to_numeric(salaire["Salaire_Brut"], errors="coerce"))
+        rows = rows.merge(self.mapping, on="Matricule", how="inner")
+        return rows.groupby(self.cell_keys, dropna=False, observed=True).agg(
+            total=("Salaire_Brut", "sum"),
+            nb_salaires=("Salaire_Brut", "count"),
+            nb_employes=("Matricule", "nunique"),
+        ).reset_index()
+
+    # Nouveau cube où seules les cellules des mois `months` sont recalculées à partir
+    # des lignes de Salaire à jour (au moins toutes celles de ces mois) ; le cube
+    # courant n'est pas modifié
+    def with_months(self, salaire, months):
+        months = list(months)
+        kept = self.cells[~self.cells["Mois"].isin(months)]
+        fresh = self._build_cells(salaire[salaire["Mois"].isin(months)])
+        if isinstance(salaire["Mois"].dtype, pd.CategoricalDtype) and not kept.empty:
+            kept = kept.assign(Mois=kept["Mois"].astype(salaire["Mois"].dtype))
+        updated = copy.copy(self)
+        updated.cells = pd.concat([kept, fresh], ignore_index=True).sort_values(self.cell_keys, ignore_index=True)
+        return updated
+
+    def _mask(self, frame, direction=None, departements=None, noeuds=None):
+        return cell_mask(frame, self.org_tree, direction, departements, noeuds)
+
+    # Cellules de paie correspondant aux filtres (direction=None pour « Tous »)
+    def select(self, direction=None, departements=None, noeuds=None):
+        return self.cells[self._mask(self.cells, direction, departements, noeuds)]
+
+    # Nombre d'employés correspondant aux filtres
+    def effectif(self, direction=None, departements=None, noeuds=None):
+        return int(self.headcount.loc[self._mask(self.headcount, direction, departements, noeuds), "effectif"].sum())
+
+    # Matricules des employés correspondant aux filtres
+    def matricules(self, direction=None, departements=None, noeuds=None):
+        return self.mapping.loc[self._mask(self.mapping, direction, departements, noeuds), "Matricule"].tolist()
+
+    # Répartition par sexe des employés correspondant aux filtres
+    def repartition_sexe(self, direction=None, departements=None, noeuds=None):
+        selected = self.headcount[self._mask(self.headcount, direction, departements, noeuds)]
+        counts = selected.groupby("Sexe", observed=True)["effectif"].sum()
+        return counts[counts > 0].sort_values(ascending=False)
+
+    # Indicateurs de paie : masse totale, salaire moyen, nombre de mois et série mensuelle
+    @traced("cube : synthèse filtrée", rows=lambda result: len(result["mensuel"]))
+    def summary(self, direction=None, departements=None, noeuds=None):
+        cells = self.select(direction, departements, noeuds)
+        total = cells["total"].sum()
+        nb_salaires = cells["nb_salaires"].sum()
+        nb_mois = cells["Mois"].nunique()
+        monthly = cells.groupby("Mois", observed=True)["total"].sum().rename("Salaire_Brut").reset_index()
+        return {
+            "total": total,
+            "salaire_moyen": total / nb_salaires if nb_salaires > 0 else float("nan"),
+            "nb_mois": nb_mois,
+            "masse_moyenne_mois": total / nb_mois if nb_mois > 0 else float("nan"),
+            "mensuel": monthly,
+            "vide": cells.empty,
+        }
@@ -0,0 +1,254 @@
+# Export groupé : un rapport Excel par direction et un dossier par employé (fiche
+# Excel, photo et CV), réunis dans une archive ZIP écrite au fil de l'eau sur le
+# disque. Les classeurs sont produits par lots dans un pool de processus ; chaque
+# dossier reprend le découpage par matricule (omnis.index) et la mise en forme
+# de l'onglet « Analyse individuelle ».
+import io
+import os
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import pandas as pd
+
+from omnis.assets import cv_name, photo_name
+from omnis.cube import SalaryCube
+from omnis.formatting import format_ar, format_df
+from omnis.index import build_matricule_index, employee_slices
+from omnis.instrument import span
+from omnis.organisation import OrgIndex, OrgTree
+from omnis.paging import absences_par_mois, totaux_historique
+from omnis.timeseries import TrendSeries
+
+EXPORT_DIR = os.environ.get("OMNIS_RH_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "omnis_rh_exports"))
+# Dossiers par tâche envoyée au pool, et tâches en cours par processus (borne la mémoire)
+BATCH_SIZE = 25
+IN_FLIGHT_PER_WORKER = 2
+
+# Structures précalculées utiles aux rapports et dossiers (seules transmises au pool)
+STRUCTURE_KEYS = ("matricule_index", "salary_cube", "org_index", "trends")
+
+# Feuilles du dossier employé, dans l'ordre de l'onglet « Analyse individuelle »
+DOSSIER_SHEETS = ["Salaire", "Évaluations", "Formations", "Missions", "Présences_Absences", "Historique"]
+
+# État des processus du pool (transmis une fois par processus à son démarrage)
+_worker = {}
+
+
+# Nom de fichier / de dossier sans caractères interdits
+def safe_name(text):
+    return re.sub(r'[\\/:*?"<>|]+', "_", str(text)).strip() or "_"
+
+
+def _rate(value):
+    return f"{value:.1f} %" if pd.notna(value) else "N/A"
+
+
+def _first(slices, sheet):
+    df = slices.get(sheet)
+    return df.iloc[0] if df is not None and not df.empty else pd.Series(dtype=object)
+
+
+# Profil d'un employé (mêmes rubriques que l'onglet « Analyse individuelle »)
+def employee_profile(matricule, slices):
+    ident, poste = _first(slices, "Identité"), _first(slices, "Poste_et_Carrière")
+    naissance = pd.to_datetime(ident.get("Date_Naissance"), errors="coerce")
+    age = f"{(datetime.now() - naissance).days // 365} ans" if pd.notna(naissance) else "N/A"
+    salaire = slices.get("Salaire", pd.DataFrame())
+    salaire_moyen = "N/A"
+    if not salaire.empty and {"Mois", "Salaire_Brut"} <= set(salaire.columns) and salaire["Mois"].nunique() > 0:
+        salaire_moyen = format_ar(pd.to_numeric(salaire["Salaire_Brut"], errors="coerce").sum() / salaire["Mois"].nunique())
+    missions = slices.get("Missions", pd.DataFrame())
+    presences = slices.get("Présences_Absences", pd.DataFrame())
+    rows = [
+        ("Matricule", matricule),
+        ("Nom", ident.get("Nom", "N/A")),
+        ("Prénom", ident.get("Prénom", "N/A")),
+        ("Âge", age),
+        ("Sexe", ident.get("Sexe", "N/A")),
+        ("Direction", poste.get("Direction", "N/A")),
+        ("Département", poste.get("Département", "N/A")),
+        ("Poste actuel", poste.get("Poste_Actuel", "N/A")),
+        ("Années d’expérience dans la société", poste.get("Ancienneté", "N/A")),
+        ("Niveau d’études", ident.get("Niveau_études", "N/A")),
+        ("Compétences clés", ident.get("Compétences_clés", "N/A")),
+        ("Salaire moyen par mois", salaire_moyen),
+        ("Missions actives", int((missions["Statut"] == "En cours").sum()) if "Statut" in missions.columns else "N/A"),
+        ("Congés restants", presences["Congé_restant"].iloc[0] if "Congé_restant" in presences.columns and not presences.empty else "N/A"),
+    ]
+    return pd.DataFrame(rows, columns=["Rubrique", "Valeur"]).astype({"Valeur": str})
+
+
+def _workbook(sheets):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name[:31], index=not isinstance(df.index, pd.RangeIndex))
+    return buffer.getvalue()
+
+
+# Dossier Excel d'un employé : profil puis une feuille mise en forme par feuille source
+def dossier_workbook(matricule, slices):
+    sheets = {"Profil": employee_profile(matricule, slices)}
+    for sheet in DOSSIER_SHEETS:
+        df = slices.get(sheet)
+        if df is None or df.empty:
+            continue
+        sheets[sheet] = format_df(df)
+        if sheet == "Présences_Absences":
+            monthly = absences_par_mois(df)
+            if not monthly.empty:
+                sheets["Absences par mois"] = monthly
+        elif sheet == "Historique":
+            totals = totaux_historique(df)
+            if not totals.empty:
+                sheets["Totaux historique"] = format_df(totals)
+    return _workbook(sheets)
+
+
+# Rapport Excel d'un nœud de l'organigramme (direction, DGA...) : synthèse, tendances,
+# dépenses mensuelles et liste des employés rattachés au sous-arbre
+def direction_report(node, data, structures):
+    cube, org_index, trends = structures["salary_cube"], structures["org_index"], structures["trends"]
+    summary = cube.summary(noeuds=[node])
+    rollup = org_index.kpis(node)
+    synthese = pd.DataFrame([
+        ("Direction", node),
+        ("Employés", cube.effectif(noeuds=[node])),
+        ("Masse salariale totale", format_ar(summary["total"]) if not summary["vide"] else "N/A"),
+        ("Salaire moyen", format_ar(summary["salaire_moyen"]) if not summary["vide"] else "N/A"),
+        ("Masse salariale moyenne/mois", format_ar(summary["masse_moyenne_mois"]) if not summary["vide"] else "N/A"),
+        ("Taux de turnover (cumulé)", _rate(rollup["taux_turnover"])),
+        ("Taux d'absentéisme (cumulé)", _rate(rollup["taux_absenteisme"])),
+    ], columns=["Rubrique", "Valeur"]).astype({"Valeur": str})
+    sheets = {"Synthèse": synthese}
+
+    monthly = trends.monthly(noeuds=[node])
+    if not monthly.empty:
+        sheets["Tendances"] = monthly.round(2)
+    absence_types = trends.absence_types(noeuds=[node])
+    if not absence_types.empty:
+        sheets["Absences par motif"] = absence_types
+    if not summary["mensuel"].empty:
+        sheets["Dépenses mensuelles"] = format_df(summary["mensuel"])
+
+    matricules = org_index.employees_under(node)
+    poste = data.get("Poste_et_Carrière", pd.DataFrame())
+    identité = data.get("Identité", pd.DataFrame())
+    if len(matricules) and "Matricule" in poste.columns:
+        employes = poste[poste["Matricule"].isin(matricules)].drop_duplicates("Matricule")
+        if "Matricule" in identité.columns:
+            columns = [c for c in ["Matricule", "Nom", "Prénom", "Sexe"] if c in identité.columns]
+            employes = identité[columns].drop_duplicates("Matricule").merge(employes, on="Matricule", how="right")
+        sheets["Employés"] = format_df(employes.sort_values("Matricule", ignore_index=True))
+    return _workbook(sheets)
+
+
+# Structures utilisées par les rapports, quand l'appelant ne les a pas déjà construites
+def build_structures(data):
+    poste = data.get("Poste_et_Carrière", pd.DataFrame())
+    tree = OrgTree(poste=poste)
+    return {
+        "matricule_index": build_matricule_index(data),
+        "salary_cube": SalaryCube(poste, data.get("Salaire", pd.DataFrame()), data.get("Identité"), tree),
+        "org_index": OrgIndex(tree, poste, data.get("Salaire"), data.get("Présences_Absences"), data.get("Turnover")),
+        "trends": TrendSeries(poste, data.get("Salaire"), data.get("Présences_Absences"), data.get("Turnover"), tree),
+    }
+
+
+# Nœuds ayant un rapport pour une sélection : le nœud et toutes les directions en dessous
+def report_nodes(tree, node):
+    nodes = [n for n in tree.subtree(node) if tree.children_of(n)]
+    return nodes or [node]
+
+
+def _init_worker(data, structures):
+    _worker["data"] = data
+    _worker["structures"] = structures
+
+
+# Tâche du pool : rapports de nœuds ou lot de dossiers →
+# [(dossier dans l'archive, nom du fichier, octets, matricule ou None)]
+def _run_task(kind, items):
+    data, structures = _worker["data"], _worker["structures"]
+    if kind == "rapport":
+        return [("directions", f"{safe_name(node)}.xlsx", direction_report(node, data, structures), None) for node in items]
+    results = []
+    for matricule in items:
+        slices = employee_slices(data, structures["matricule_index"], matricule)
+        results.append((_dossier_dir(matricule, slices), f"dossier_{matricule}.xlsx", dossier_workbook(matricule, slices), matricule))
+    return results
+
+
+def _dossier_dir(matricule, slices):
+    poste = _first(slices, "Poste_et_Carrière")
+    departement = poste.get("Département")
+    departement = departement if isinstance(departement, str) else "Sans département"
+    return f"dossiers/{safe_name(departement)}/{matricule}"
+
+
+# Archive ZIP des rapports (`nodes`) et dossiers (`matricules`) écrite dans `path`.
+# Les fichiers Excel sont compressés, les photos et CV (déjà compressés) stockés tels
+# quels. `progress(faits, total, détail)` est appelé après chaque tâche terminée.
+def export_bundle(path, data, nodes=(), matricules=(), structures=None, photos=None, cvs=None,
+                  parallel=True, max_workers=None, progress=None):
+    started = time.perf_counter()
+    structures = build_structures(data) if structures is None else {key: structures[key] for key in STRUCTURE_KEYS}
+    matricules = list(matricules)
+    tasks = [("rapport", [node]) for node in nodes]
+    tasks += [("dossier", matricules[i:i + BATCH_SIZE]) for i in range(0, len(matricules), BATCH_SIZE)]
+    total = len(nodes) + len(matricules)
+    counts = {"rapports": 0, "dossiers": 0, "photos": 0, "cvs": 0}
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=".zip", dir=directory)
+    os.close(fd)
+    try:
+        with span("export groupé", rows=total), zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as archive:
+            def write(kind, results):
+                for folder, filename, content, matricule in results:
+                    archive.writestr(f"{folder}/{filename}", content)
+                    counts["rapports" if kind == "rapport" else "dossiers"] += 1
+                    if matricule is None:
+                        continue
+                    for store, asset_name, key in ((photos, photo_name(matricule), "photos"), (cvs, cv_name(matricule), "cvs")):
+                        asset = store.read(asset_name) if store is not None else None
+                        if asset is not None:
+                            archive.writestr(f"{folder}/{asset_name}", asset, compress_type=zipfile.ZIP_STORED)
+                            counts[key] += 1
+                if progress is not None and results:
+                    progress(counts["rapports"] + counts["dossiers"], total, results[-1][1])
+
+            workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+            if parallel and workers > 1:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data, structures)) as pool:
+                    pending, queue = {}, iter(tasks)
+                    while True:
+                        # Nombre borné de tâches en cours : les classeurs produits sont écrits
+                        # dans l'archive au fur et à mesure au lieu de s'accumuler en mémoire
+                        for kind, items in queue:
+                            pending[pool.submit(_run_task, kind, items)] = kind
+                            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                                break
+                        if not pending:
+                            break
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            write(pending.pop(future), future.result())
+            else:
+                _init_worker(data, structures)
+                try:
+                    for kind, items in tasks:
+                        write(kind, _run_task(kind, items))
+                finally:
+                    _worker.clear()
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return {**counts, "chemin": path, "octets": os.path.getsize(path), "secondes": time.perf_counter() - started}
@@ -0,0 +1,169 @@
+# Mise en forme des tableaux affichés : montants en Ariary et dates en français.
+# Les colonnes sont converties d'un bloc (opérations vectorisées) ; seules les
+# valeurs atypiques (décimales, infinis, dates non reconnues) repassent par les
+# fonctions cellule par cellule, ce qui garantit un rendu identique.
+import functools
+
+import numpy as np
+import pandas as pd
+
+from omnis.instrument import traced
+
+MONETARY_KEYWORDS = ("salaire", "bonus", "montant", "prime", "indemnité", "sanction", "coût", "cout", "depense", "dépense")
+DATE_KEYWORDS = ("date", "naissance", "debut", "fin", "mois", "annee", "année")
+
+MONTHS = {
+    1: 'janvier', 2: 'février', 3: 'mars', 4: 'avril',
+    5: 'mai', 6: 'juin', 7: 'juillet', 8: 'août',
+    9: 'septembre', 10: 'octobre', 11: 'novembre', 12: 'décembre'
+}
+MONTH_NAMES = np.array([""] + [MONTHS[m] for m in range(1, 13)], dtype=object)
+
+# Au-delà, les centimes ne tiennent plus exactement dans un entier 64 bits
+MAX_EXACT_AMOUNT = 1e15
+
+
+# Fonction pour formater les montants en Ariary avec espace comme séparateur
+def format_ar(value):
+    if pd.isna(value):
+        return "N/A"
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return str(value)
+    formatted = f"{value:,.2f}".replace(",", " ")
+    return f"{formatted} Ar"
+
+
+# Fonction pour formater une date en français (ex. : 22 janvier 2025)
+def format_french_date(value):
+    if pd.isna(value):
+        return "N/A"
+    try:
+        dt = pd.to_datetime(value)
+        day = dt.day
+        month = MONTHS[dt.month]
+        year = dt.year
+        return f"{day} {month} {year}"
+    except (ValueError, TypeError):
+        return str(value)
+
+
+# Classification des colonnes (monétaires / dates), mémorisée par schéma de feuille.
+# Une colonne monétaire n'est pas reformatée ensuite comme une date.
+@functools.lru_cache(maxsize=512)
+def classify_columns(schema):
+    monetary, dates = [], []
+    for column, is_datetime in schema:
+        name = str(column).lower()
+        if any(keyword in name for keyword in MONETARY_KEYWORDS):
+            monetary.append(column)
+        elif is_datetime or any(keyword in name for keyword in DATE_KEYWORDS):
+            dates.append(column)
+    return tuple(monetary), tuple(dates)
+
+
+def _schema(df):
+    return tuple((column, pd.api.types.is_datetime64_any_dtype(df[column])) for column in df.columns)
+
+
+# Chaînes "-1 234 567.89 Ar" pour des montants ayant tous le même nombre de chiffres
+# et le même signe : chaque caractère est calculé colonne par colonne sur une matrice
+# de points de code, puis la matrice est relue comme un tableau de chaînes
+def _format_cents_block(cents, n_digits, negative):
+    rows = len(cents)
+    int_width = n_digits + (n_digits - 1) // 3
+    width = int(negative) + int_width + 6
+    block = np.empty((rows, width), dtype=np.uint32, order="F")
+    if negative:
+        block[:, 0] = ord("-")
+    rest = cents // 100
+    end = width - 7
+    for distance in range(n_digits):
+        column = end - (distance + distance // 3)
+        block[:, column] = rest % 10 + ord("0")
+        rest //= 10
+        if distance % 3 == 2 and distance < n_digits - 1:
+            block[:, column - 1] = ord(" ")
+    fraction = cents % 100
+    block[:, -6] = ord(".")
+    block[:, -5] = fraction // 10 + ord("0")
+    block[:, -4] = fraction % 10 + ord("0")
+    block[:, -3] = ord(" ")
+    block[:, -2] = ord("A")
+    block[:, -1] = ord("r")
+    return np.ascontiguousarray(block).view(f"<U{width}").ravel().astype(object)
+
+
+# Montants exacts au centime → chaînes, traitées par groupes (nombre de chiffres, signe)
+def _format_cents(cents, negative):
+    integers = cents // 100
+    n_digits = np.ones(len(cents), dtype=np.int64)
+    power = 10
+    while power <= integers.max():
+        n_digits += integers >= power
+        power *= 10
+    key = n_digits * 2 + negative
+    order = np.argsort(key, kind="stable")
+    sorted_keys = key[order]
+    bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+    result = np.empty(len(cents), dtype=object)
+    for start, stop in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(cents)]))):
+        rows = order[start:stop]
+        group = int(sorted_keys[start])
+        result[rows] = _format_cents_block(cents[rows], group // 2, bool(group % 2))
+    return result
+
+
+# Version vectorisée de format_ar pour une colonne entière
+def format_ar_series(series):
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    result = np.full(len(values), "N/A", dtype=object)
+    magnitude = np.abs(values)
+    cents = np.round(magnitude * 100)
+    # Chemin rapide : montants finis dont l'écriture au centime est exacte
+    exact = np.isfinite(values) & (magnitude < MAX_EXACT_AMOUNT) & (cents / 100 == magnitude)
+    if exact.any():
+        result[exact] = _format_cents(cents[exact].astype(np.int64), np.signbit(values[exact]))
+    # Autres valeurs (décimales non exactes, infinis, très grands montants) : chemin scalaire
+    other = ~exact & ~np.isnan(values)
+    if other.any():
+        result[other] = [format_ar(v) for v in values[other]]
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+# Version vectorisée de format_french_date pour une colonne entière
+def format_date_series(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        dates = series
+    elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        dates = pd.to_datetime(series, errors="coerce")
+    else:
+        dates = pd.to_datetime(series, errors="coerce", format="mixed")
+    result = np.full(len(series), "N/A", dtype=object)
+    parsed = dates.notna().to_numpy()
+    if parsed.any():
+        valid = dates[parsed]
+        days = valid.dt.day.to_numpy().astype(str).astype(object)
+        months = MONTH_NAMES[valid.dt.month.to_numpy()]
+        years = valid.dt.year.to_numpy().astype(str).astype(object)
+        result[parsed] = days + " " + months + " " + years
+    # Valeurs non reconnues comme dates : rendu cellule par cellule (texte d'origine)
+    other = ~parsed & series.notna().to_numpy()
+    if other.any():
+        result[other] = [format_french_date(v) for v in series[other]]
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+# Fonction combinée : monétaire + dates
+@traced("format_df", rows=len)
+def format_df(df):
+    if df.empty:
+        return df
+    monetary, dates = classify_columns(_schema(df))
+    formatted = df.copy()
+    for col in monetary:
+        formatted[col] = format_ar_series(df[col])
+    for col in dates:
+        formatted[col] = format_date_series(df[col])
+    return formatted
@@ -0,0 +1,38 @@
+# Index Matricule → positions des lignes, pour toutes les feuilles du classeur.
+# Construit une seule fois par jeu de données ; le profil d'un employé est
+# ensuite assemblé par découpage (iloc) au lieu d'un balayage de chaque feuille.
+import numpy as np
+
+from omnis.instrument import traced
+
+
+# Index par feuille : {feuille: {matricule: tableau des positions}}
+def build_matricule_index(data):
+    index = {}
+    for sheet, df in data.items():
+        if "Matricule" in df.columns:
+            index[sheet] = df.groupby("Matricule", sort=False, observed=True).indices
+    return index
+
+
+# Positions des lignes d'un matricule dans une feuille (tableau vide si absent)
+def row_positions(index, sheet, matricule):
+    return index.get(sheet, {}).get(matricule, np.empty(0, dtype=np.intp))
+
+
+# Lignes de chaque feuille concernant un matricule
+@traced("fiche employé", rows=lambda slices: sum(len(df) for df in slices.values()))
+def employee_slices(data, index, matricule):
+    return {sheet: data[sheet].iloc[row_positions(index, sheet, matricule)] for sheet in index}
+
+
+# Index d'une feuille après ajout de lignes en fin de tableau (positions à partir
+# de `offset`) : seuls les matricules du delta sont touchés ; l'index d'origine
+# n'est pas modifié
+def extend_sheet_index(sheet_index, added, offset):
+    extended = dict(sheet_index)
+    for matricule, positions in added.groupby("Matricule", sort=False, observed=True).indices.items():
+        positions = positions + offset
+        previous = extended.get(matricule)
+        extended[matricule] = positions if previous is None else np.concatenate((previous, positions))
+    return extended
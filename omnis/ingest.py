@@ -0,0 +1,133 @@
+# Import mensuel incrémental : un classeur ou un CSV ne contenant que les nouvelles
+# périodes est ajouté au jeu de données existant, sans relire tout l'historique.
+# Les lignes sont dédoublonnées sur la clé naturelle de chaque feuille ; en cas de
+# doublon avec l'existant, la ligne du delta remplace l'ancienne (corrections).
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from omnis.cache import hash_bytes, read_bytes
+from omnis.schema import SCHEMAS, normalize_sheet
+
+# Feuilles alimentées chaque mois et leur clé naturelle
+NATURAL_KEYS = {
+    "Salaire": ["Matricule", "Mois"],
+    "Présences_Absences": ["Matricule", "Date"],
+    "Historique": ["Matricule", "Date", "Type"],
+}
+# Colonne de période de chaque feuille : seules les lignes existantes des mois couverts
+# par le delta sont comparées aux clés du delta
+PERIOD_COLUMNS = {
+    "Salaire": "Mois",
+    "Présences_Absences": "Date",
+    "Historique": "Date",
+}
+
+
+# Lecture d'un fichier delta ; renvoie (empreinte, {feuille: lignes}).
+# Pour un CSV, la feuille est `sheet` ou, à défaut, le nom du fichier (Salaire.csv)
+def read_delta(source, name=None, sheet=None):
+    content = read_bytes(source)
+    name = name or getattr(source, "name", None) or (os.fspath(source) if isinstance(source, (str, os.PathLike)) else "")
+    if name.lower().endswith(".csv"):
+        sheet = sheet or os.path.splitext(os.path.basename(name))[0]
+        frames = {sheet: pd.read_csv(io.BytesIO(content))}
+    else:
+        frames = pd.read_excel(io.BytesIO(content), sheet_name=None)
+    return hash_bytes(content), frames
+
+
+# Empreinte du jeu de données obtenu après ajout d'un delta
+def merged_digest(digest, delta_digest):
+    return hash_bytes(f"{digest}+{delta_digest}".encode())
+
+
+def _keys(df, keys):
+    return pd.MultiIndex.from_arrays([df[key] for key in keys])
+
+
+# Lignes existantes appartenant aux mois du delta : dates comprises dans l'un des mois
+# couverts par les dates du delta, ou mêmes valeurs de Mois
+def _period_mask(existing, delta, column):
+    values = existing[column]
+    if pd.api.types.is_datetime64_any_dtype(values) and pd.api.types.is_datetime64_any_dtype(delta[column]):
+        mask = np.zeros(len(existing), dtype=bool)
+        for month in delta[column].dropna().dt.to_period("M").unique():
+            mask |= values.between(month.start_time, month.end_time).to_numpy()
+        return mask
+    return values.isin(delta[column].dropna().unique()).to_numpy()
+
+
+# Catégories de l'existant étendues aux valeurs du delta, pour que la concaténation
+# conserve le type catégoriel
+def _align_categories(existing, added):
+    for col in existing.columns:
+        if isinstance(existing[col].dtype, pd.CategoricalDtype) and col in added.columns:
+            values = added[col].cat.categories if isinstance(added[col].dtype, pd.CategoricalDtype) else added[col].dropna().unique()
+            dtype = pd.CategoricalDtype(existing[col].cat.categories.union(values))
+            if dtype != existing[col].dtype:
+                existing = existing.assign(**{col: existing[col].astype(dtype)})
+            added = added.assign(**{col: added[col].astype(dtype)})
+    return existing, added
+
+
+# Ajout d'un delta (typé par prepare_delta) à une feuille ; renvoie (feuille à jour, lignes ajoutées,
+# lignes remplacées, lignes à jour des mois du delta). Avec `period`, seules les lignes
+# existantes de ces mois sont comparées aux clés : le coût suit la taille du delta.
+def merge_sheet(existing, delta, keys, period=None):
+    missing = [key for key in keys + ([period] if period else []) if key not in existing.columns]
+    if missing:
+        raise ValueError(f"colonnes de clé absentes : {', '.join(missing)}")
+    added = delta.drop_duplicates(keys, keep="last")
+    if period is not None:
+        in_period = _period_mask(existing, added, period)
+    else:
+        in_period = np.ones(len(existing), dtype=bool)
+    positions = np.flatnonzero(in_period)
+    candidates = existing.iloc[positions]
+    replaced = _keys(candidates, keys).isin(_keys(added, keys))
+    removed = candidates[replaced]
+    if replaced.any():
+        keep = np.ones(len(existing), dtype=bool)
+        keep[positions[replaced]] = False
+        kept, in_period = existing[keep], in_period[keep]
+    else:
+        kept = existing
+    kept, added = _align_categories(kept, added.reindex(columns=existing.columns))
+    merged = pd.concat([kept, added], ignore_index=True)
+    period_rows = merged.iloc[np.concatenate([np.flatnonzero(in_period), np.arange(len(kept), len(merged))])]
+    return merged, added, removed, period_rows
+
+
+# Typage et dédoublonnage des feuilles d'un delta ; renvoie ({feuille: lignes}, feuilles ignorées)
+def prepare_delta(frames):
+    prepared, ignored = {}, []
+    for sheet, delta in frames.items():
+        keys = NATURAL_KEYS.get(sheet)
+        if keys is None or delta.empty:
+            ignored.append(sheet)
+            continue
+        missing = [key for key in keys if key not in delta.columns]
+        if missing:
+            raise ValueError(f"{sheet} : colonnes de clé absentes : {', '.join(missing)}")
+        prepared[sheet] = normalize_sheet(delta, SCHEMAS.get(sheet, {})).drop_duplicates(keys, keep="last")
+    return prepared, ignored
+
+
+# Ajout de tous les deltas ; renvoie (données à jour, changements par feuille, feuilles ignorées).
+# Chaque changement donne les lignes ajoutées, remplacées et toutes les lignes à jour des
+# mois touchés (« periode »), à partir desquelles les structures dérivées sont recalculées.
+# Les feuilles non modifiées sont partagées telles quelles avec le jeu de données d'origine.
+def merge_delta(data, frames):
+    prepared, ignored = prepare_delta(frames)
+    merged, changes = dict(data), {}
+    for sheet, delta in prepared.items():
+        if sheet not in data:
+            ignored.append(sheet)
+            continue
+        period = PERIOD_COLUMNS[sheet] if PERIOD_COLUMNS[sheet] in data[sheet].columns else None
+        merged[sheet], added, removed, period_rows = merge_sheet(data[sheet], delta, NATURAL_KEYS[sheet], period)
+        changes[sheet] = {"ajoutees": added, "remplacees": removed, "periode": period_rows}
+    return merged, changes, ignored
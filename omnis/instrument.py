@@ -0,0 +1,122 @@
+# Instrumentation optionnelle des étapes de l'application (chargement, lecture des
+# feuilles, indicateurs, graphiques, fiche employé, mise en forme).
+# Le traceur actif est porté par une variable de contexte : chaque session active
+# le sien, les threads de fond en héritent, et sans traceur actif les points de
+# mesure se réduisent à une simple lecture de variable.
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+MAX_SPANS = 5000
+
+_current = contextvars.ContextVar("omnis_tracer", default=None)
+
+
+class Tracer:
+    def __init__(self, max_spans=MAX_SPANS):
+        self.spans = deque(maxlen=max_spans)
+        # Mémoire des feuilles par jeu de données : {empreinte: {feuille: {lignes, octets}}}
+        self.frames = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, name, seconds, rows=None, **extra):
+        span = {"etape": name, "debut": time.time() - seconds, "secondes": seconds, "lignes": rows,
+                "thread": threading.current_thread().name, **extra}
+        with self._lock:
+            self.spans.append(span)
+
+    # Lignes et mémoire de chaque feuille d'un jeu de données (une fois par empreinte)
+    def record_frames(self, digest, data):
+        if digest in self.frames:
+            return
+        self.frames[digest] = {sheet: {"lignes": len(df), "octets": int(df.memory_usage(deep=True).sum())}
+                               for sheet, df in data.items()}
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+        self.frames.clear()
+
+    # Synthèse par étape : nombre d'appels, durées totale / moyenne / maximale, lignes
+    def summary(self):
+        with self._lock:
+            spans = list(self.spans)
+        if not spans:
+            return pd.DataFrame(columns=["etape", "appels", "total_ms", "moyenne_ms", "max_ms", "lignes"])
+        df = pd.DataFrame(spans)
+        grouped = df.groupby("etape", sort=False)
+        summary = pd.DataFrame({
+            "appels": grouped.size(),
+            "total_ms": grouped["secondes"].sum() * 1e3,
+            "moyenne_ms": grouped["secondes"].mean() * 1e3,
+            "max_ms": grouped["secondes"].max() * 1e3,
+            "lignes": grouped["lignes"].sum(min_count=1),
+        })
+        return summary.sort_values("total_ms", ascending=False).reset_index()
+
+    def to_json(self):
+        with self._lock:
+            spans = list(self.spans)
+        return json.dumps({"debut": self.started, "etapes": spans, "feuilles": self.frames},
+                          ensure_ascii=False, indent=2, default=str)
+
+
+# Traceur de la session / du thread courant (None : instrumentation désactivée)
+def activate(tracer):
+    _current.set(tracer)
+
+
+def current():
+    return _current.get()
+
+
+# Mesure d'un bloc ; le dictionnaire renvoyé permet de renseigner `rows` après coup
+@contextmanager
+def span(name, rows=None, **extra):
+    tracer = _current.get()
+    info = {"rows": rows, **extra}
+    if tracer is None:
+        yield info
+        return
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        rows = info.pop("rows")
+        tracer.record(name, time.perf_counter() - start, rows, **info)
+
+
+# Décorateur : mesure chaque appel ; `rows(résultat)` donne le nombre de lignes traitées
+def traced(name, rows=None):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _current.get()
+            if tracer is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            tracer.record(name, time.perf_counter() - start, rows(result) if rows is not None else None)
+            return result
+        return wrapper
+    return decorator
+
+
+def frame_rows(data):
+    return int(sum(len(df) for df in data.values()))
+
+
+# Temps de lecture par feuille déjà mesurés par le chargeur (y compris dans les processus fils)
+def record_timings(timings):
+    tracer = _current.get()
+    if tracer is None:
+        return
+    for sheet, timing in timings.items():
+        tracer.record(f"lecture feuille : {sheet}", timing["seconds"], timing["rows"], moteur=timing["engine"])
@@ -0,0 +1,108 @@
+# Indicateurs du tableau de bord général, calculés sans Streamlit.
+# Tous les indicateurs et séries de l'onglet 1 sont produits en un seul passage
+# et mémorisés par empreinte de jeu de données ; le module sert aussi en ligne de
+# commande (python -m omnis kpi fichier.xlsx) pour les traitements nocturnes.
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from omnis.instrument import span
+
+MAX_MEMO = 16
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _sheet(data, name):
+    df = data.get(name)
+    return df if df is not None else pd.DataFrame()
+
+
+# Calcul de tous les indicateurs ; un indicateur vaut None si sa feuille est absente ou vide
+def compute_kpis(data):
+    identité = _sheet(data, "Identité")
+    poste = _sheet(data, "Poste_et_Carrière")
+    salaire = _sheet(data, "Salaire")
+    presences = _sheet(data, "Présences_Absences")
+    turnover = _sheet(data, "Turnover")
+
+    # Employés présents à la fois dans Identité et Poste_et_Carrière
+    with span("kpi : total employés", rows=len(identité) + len(poste)):
+        if not identité.empty and not poste.empty:
+            total_employes = len(identité[["Matricule"]].merge(poste[["Matricule"]], on="Matricule", how="inner"))
+        else:
+            total_employes = 0
+
+    kpis = {
+        "total_employes": total_employes,
+        "taux_turnover": None,
+        "salaire_moyen_brut": None,
+        "taux_absenteisme": None,
+        "pct_femmes": None,
+        "depenses_totales": None,
+        "depenses_mensuelles": None,
+        "repartition_sexe": None,
+        "motifs_depart": None,
+    }
+    if not turnover.empty:
+        with span("kpi : turnover", rows=len(turnover)):
+            kpis["taux_turnover"] = (len(turnover) / total_employes * 100) if total_employes > 0 else 0
+            if "Motif" in turnover.columns:
+                motifs = turnover["Motif"].value_counts()
+                kpis["motifs_depart"] = motifs[motifs > 0]
+    if not salaire.empty:
+        with span("kpi : salaires", rows=len(salaire)):
+            brut = pd.to_numeric(salaire["Salaire_Brut"], errors="coerce")
+            kpis["salaire_moyen_brut"] = brut.mean()
+            kpis["depenses_totales"] = brut.sum()
+            kpis["depenses_mensuelles"] = brut.groupby(salaire["Mois"], observed=True).sum().rename("Salaire_Brut").reset_index()
+    if not presences.empty:
+        with span("kpi : absentéisme", rows=len(presences)):
+            kpis["taux_absenteisme"] = (presences["Type"] != "Présence").sum() / len(presences) * 100
+    if not identité.empty and "Sexe" in identité.columns:
+        with span("kpi : répartition H/F", rows=len(identité)):
+            kpis["pct_femmes"] = ((identité["Sexe"] == "Femme").sum() / total_employes * 100) if total_employes > 0 else 0
+            repartition = identité["Sexe"].value_counts()
+            kpis["repartition_sexe"] = repartition[repartition > 0]
+    return kpis
+
+
+# Indicateurs mémorisés par empreinte du jeu de données
+def kpis_for(digest, data):
+    with _memo_lock:
+        if digest in _memo:
+            _memo.move_to_end(digest)
+            return _memo[digest]
+    kpis = compute_kpis(data)
+    with _memo_lock:
+        _memo[digest] = kpis
+        while len(_memo) > MAX_MEMO:
+            _memo.popitem(last=False)
+    return kpis
+
+
+def _plain(value):
+    if value is None:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+# Conversion en structure JSON (séries → listes / dictionnaires)
+def kpis_to_dict(kpis):
+    result = {}
+    for name, value in kpis.items():
+        if isinstance(value, pd.DataFrame):
+            result[name] = [{col: _plain(v) for col, v in row.items()} for row in value.to_dict("records")]
+        elif isinstance(value, pd.Series):
+            result[name] = {str(k): _plain(v) for k, v in value.items()}
+        else:
+            result[name] = _plain(value)
+    return result
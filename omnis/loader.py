@@ -0,0 +1,120 @@
+# Lecture parallèle et en flux des feuilles d'un classeur Excel.
+# Chaque feuille est lue dans un processus séparé ; openpyxl est utilisé en mode
+# lecture seule, par blocs de lignes, pour borner la mémoire sur les grosses
+# feuilles (Salaire, Présences_Absences, Historique). Le moteur calamine est
+# préféré lorsqu'il est installé.
+import importlib.util
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+CHUNK_ROWS = 50_000
+
+
+# Moteur le plus rapide disponible
+def default_engine():
+    if importlib.util.find_spec("python_calamine") is not None:
+        return "calamine"
+    return "openpyxl"
+
+
+# Noms des feuilles, sans charger leur contenu
+def sheet_names(path, engine=None):
+    engine = engine or default_engine()
+    if engine == "calamine":
+        with pd.ExcelFile(path, engine="calamine") as xls:
+            return list(xls.sheet_names)
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+# En-têtes au format de pd.read_excel : "Unnamed: i" pour les vides, suffixes ".n" pour les doublons
+def _header(row):
+    seen = {}
+    columns = []
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+# Lecture en flux d'une feuille : seules `chunk_rows` lignes Python sont en mémoire à la fois
+def read_sheet_streaming(path, sheet, chunk_rows=CHUNK_ROWS):
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet].iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return pd.DataFrame()
+        columns = _header(first)
+        width = len(columns)
+        chunks, buffer, blank = [], [], []
+        for row in rows:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            if all(v is None for v in row):
+                # Les lignes vides ne sont conservées que si une ligne remplie les suit
+                blank.append(row)
+                continue
+            if blank:
+                buffer.extend(blank)
+                blank = []
+            buffer.append(row)
+            if len(buffer) >= chunk_rows:
+                chunks.append(pd.DataFrame(buffer, columns=columns))
+                buffer = []
+        if buffer or not chunks:
+            chunks.append(pd.DataFrame(buffer, columns=columns))
+    finally:
+        wb.close()
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+    return df.infer_objects()
+
+
+# Lecture d'une feuille avec mesure du temps écoulé (exécutée dans un processus fils)
+def parse_sheet(path, sheet, engine=None, chunk_rows=CHUNK_ROWS):
+    engine = engine or default_engine()
+    start = time.perf_counter()
+    if engine == "calamine":
+        df = pd.read_excel(path, sheet_name=sheet, engine="calamine")
+    else:
+        df = read_sheet_streaming(path, sheet, chunk_rows)
+    return sheet, df, {"seconds": time.perf_counter() - start, "rows": len(df), "engine": engine}
+
+
+# Lecture de toutes les feuilles en parallèle ; renvoie (données, temps par feuille)
+def parse_workbook_parallel(content, max_workers=None, engine=None, chunk_rows=CHUNK_ROWS):
+    engine = engine or default_engine()
+    # Les processus fils relisent le classeur depuis un fichier temporaire plutôt
+    # que de recevoir chacun une copie du contenu
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        names = sheet_names(path, engine)
+        if not names:
+            return {}, {}
+        workers = max_workers or min(len(names), os.cpu_count() or 1)
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(parse_sheet, path, name, engine, chunk_rows) for name in names]
+            for future in futures:
+                name, df, timing = future.result()
+                results[name] = (df, timing)
+    finally:
+        os.remove(path)
+    data = {name: results[name][0] for name in names}
+    timings = {name: results[name][1] for name in names}
+    return data, timings
@@ -0,0 +1,290 @@
+# Organigramme OMNIS et arbre hiérarchique des directions.
+# L'arbre est parcouru une seule fois (tour eulérien) : chaque nœud reçoit un
+# intervalle [entrée, sortie) tel que tout le sous-arbre d'un nœud occupe un
+# intervalle contigu. « Tous les employés sous X » devient une recherche par
+# intervalle, et les indicateurs cumulés s'obtiennent par sommes préfixes.
+import copy
+
+import numpy as np
+import pandas as pd
+
+from omnis.instrument import traced
+
+# Mapping Direction → Départements
+directions_mapping = {
+    'Direction Générale': [
+        'Conseiller DG',
+        'Direction des affaires juridiques et promotion',
+        'DGA Management',
+        'DGA Technique',
+        'Cellule environnement',
+        'Cellule audit et organisation',
+        'Cellule analyse des marchés énergie'
+    ],
+
+    'DGA Management': [
+        'Direction des ressources humaines',
+        'Direction administrative et financière',
+        'Direction du patrimoine et logistique',
+        'Direction système d’information'
+    ],
+
+    'DGA Technique': [
+        'Direction mine et forage',
+        'Direction des hydrocarbures',
+        'Direction laboratoire'
+    ],
+
+    'Direction des affaires juridiques et promotion': [
+        'AD Direction des affaires juridiques et promotion',
+        'Département stratégie',
+        'Département juridique',
+        'Département promotion',
+        'Département communication'
+    ],
+
+    'Cellule audit et organisation': [
+        'Auditeur'
+    ],
+
+    'Cellule analyse des marchés énergie': [
+        'Responsable suivi et évaluation des projets'
+    ],
+
+    'Direction des ressources humaines': [
+        'AD Direction des ressources humaines',
+        'Département Administration du personnel',
+        'Département socio-culturel et événementiel',
+        'Département Paie',
+        'Département Gestion des carrières et compétences',
+        'Département Sécurité',
+        'Cellule médecin et conseil'
+    ],
+
+    'Direction administrative et financière': [
+        'AD Direction administrative et financière',
+        'Département Analytique et budget',
+        'Département Trésorerie et finance',
+        'Département Comptabilité générale'
+    ],
+
+    'Direction du patrimoine et logistique': [
+        'AD Direction du patrimoine et logistique',
+        'Département Approvisionnements',
+        'Département Magasins généraux',
+        'Département Transport et maintenance',
+        'Département Affaires extérieures'
+    ],
+
+    'Direction système d’information': [
+        'AD Direction système d’information',
+        'Département Études',
+        'Département Administration réseaux, serveurs et architecture',
+        'Département Parc informatique et support'
+    ],
+
+    'Direction mine et forage': [
+        'AD Direction mine et forage',
+        'Département Suivi exploration minière',
+        'Département Base de données',
+        'Département Gestion du portefeuille minier',
+        'Département Forage et prestations',
+        'Département Études économiques et financières'
+    ],
+
+    'Direction des hydrocarbures': [
+        'AD Direction des hydrocarbures',
+        'Département Étude bassin Morondava',
+        'Département Étude bassin Nord et côte Est',
+        'Département Suivi HSE',
+        'Département Gestion de la base de données'
+    ],
+
+    'Direction laboratoire': [
+        'AD Direction laboratoire',
+        'Département Gestion administration et projets',
+        'Département Contrôle qualité',
+        'Département Pétrologie sédimentaire',
+        'Département Analyses',
+        'Département Géochimie physico-chimie',
+        'Département Traitement'
+    ]
+}
+
+ROOT = "Direction Générale"
+
+
+class OrgTree:
+    def __init__(self, mapping=None, root=ROOT, poste=None):
+        mapping = directions_mapping if mapping is None else mapping
+        self.root = root
+        self.children = {name: list(subs) for name, subs in mapping.items()}
+        self.children.setdefault(root, [])
+        # Directions et départements présents dans les données mais absents de l'organigramme
+        if poste is not None and not poste.empty:
+            self._attach_unknown(poste)
+        self._euler_tour()
+
+    def _attach_unknown(self, poste):
+        known = self._reachable()
+        pairs = poste[[c for c in ["Direction", "Département"] if c in poste.columns]].drop_duplicates()
+        for row in pairs.to_dict("records"):
+            direction, departement = row.get("Direction"), row.get("Département")
+            if isinstance(direction, str) and direction not in known:
+                self.children[self.root].append(direction)
+                known.add(direction)
+            if isinstance(departement, str) and departement not in known:
+                parent = direction if isinstance(direction, str) else self.root
+                self.children.setdefault(parent, []).append(departement)
+                known.add(departement)
+
+    def _reachable(self):
+        seen, stack = {self.root}, [self.root]
+        while stack:
+            for child in self.children.get(stack.pop(), []):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return seen
+
+    # Parcours en profondeur : ordre préfixe, profondeur, parent et intervalle de chaque nœud
+    def _euler_tour(self):
+        self.order, self.depth, self.parent = [], {}, {self.root: None}
+        self.tin, self.tout = {}, {}
+        stack = [(self.root, 0, False)]
+        while stack:
+            node, depth, leaving = stack.pop()
+            if leaving:
+                self.tout[node] = len(self.order)
+                continue
+            self.tin[node] = len(self.order)
+            self.order.append(node)
+            self.depth[node] = depth
+            stack.append((node, depth, True))
+            for child in reversed(self.children.get(node, [])):
+                # Un nœud déjà placé (organigramme mal formé) n'est pas visité deux fois
+                if child not in self.tin and child not in self.parent:
+                    self.parent[child] = node
+                    stack.append((child, depth + 1, False))
+
+    def __contains__(self, node):
+        return node in self.tin
+
+    def __len__(self):
+        return len(self.order)
+
+    # Sous-nœuds directs d'un nœud
+    def children_of(self, node):
+        return [child for child in self.children.get(node, []) if self.parent.get(child) == node]
+
+    # Tous les nœuds du sous-arbre (nœud compris)
+    def subtree(self, node):
+        return self.order[self.tin[node]:self.tout[node]]
+
+    # Position dans l'arbre de chaque ligne d'un tableau Direction/Département (vectorisé)
+    def positions(self, frame):
+        tin = pd.Series(self.tin)
+        result = pd.Series(np.nan, index=frame.index)
+        if "Département" in frame.columns:
+            result = frame["Département"].astype(object).map(tin)
+        if "Direction" in frame.columns:
+            result = result.fillna(frame["Direction"].astype(object).map(tin))
+        return result.fillna(self.tin[self.root]).to_numpy(dtype=np.int64)
+
+    # Masque des positions appartenant au sous-arbre d'un ou plusieurs nœuds
+    def within(self, positions, nodes):
+        positions = np.asarray(positions)
+        mask = np.zeros(len(positions), dtype=bool)
+        for node in nodes:
+            mask |= (positions >= self.tin[node]) & (positions < self.tout[node])
+        return mask
+
+
+class OrgIndex:
+    # Employés triés par position dans l'arbre + indicateurs cumulés par nœud
+    def __init__(self, tree, poste, salaire=None, presences=None, turnover=None):
+        self.tree = tree
+        staff = poste.drop_duplicates("Matricule") if "Matricule" in poste.columns else pd.DataFrame(columns=["Matricule"])
+        positions = tree.positions(staff)
+        order = np.argsort(positions, kind="stable")
+        self.positions = positions[order]
+        self.matricules = staff["Matricule"].to_numpy()[order]
+        self.position_of = pd.Series(positions, index=staff["Matricule"].to_numpy())
+        n = len(tree)
+
+        # Indicateurs propres à chaque nœud, indexés par position
+        own = {"effectif": np.bincount(positions, minlength=n).astype(float)}
+        own["masse_salariale"] = self._own_sum(salaire, "Salaire_Brut", self.position_of, n)
+        own["departs"] = self._own_sum(turnover, None, self.position_of, n)
+        own["absences"], own["pointages"] = self._own_presences(presences, self.position_of, n)
+        self.own = own
+        self.rollups = self._rollup(own)
+
+    # Cumul sur les sous-arbres : somme préfixe sur l'ordre du tour eulérien
+    def _rollup(self, own):
+        tree = self.tree
+        tin = np.array([tree.tin[node] for node in tree.order])
+        tout = np.array([tree.tout[node] for node in tree.order])
+        rollup = {}
+        for name, values in own.items():
+            prefix = np.concatenate(([0.0], np.cumsum(values)))
+            rollup[name] = prefix[tout] - prefix[tin]
+        rollups = pd.DataFrame(rollup, index=pd.Index(tree.order, name="Nœud"))
+        rollups["taux_turnover"] = rollups["departs"] / rollups["effectif"].where(rollups["effectif"] > 0) * 100
+        rollups["taux_absenteisme"] = rollups["absences"] / rollups["pointages"].where(rollups["pointages"] > 0) * 100
+        return rollups
+
+    @classmethod
+    def _own_presences(cls, presences, position_of, n):
+        if presences is None or presences.empty or "Type" not in presences.columns:
+            return np.zeros(n), np.zeros(n)
+        absent = (presences["Type"] != "Présence").astype(float)
+        return cls._own_sum(presences.assign(_absent=absent), "_absent", position_of, n), cls._own_sum(presences, None, position_of, n)
+
+    # Nouvel index tenant compte de lignes ajoutées / retirées d'une feuille
+    # (Salaire ou Présences_Absences) : seules les lignes du delta sont parcourues,
+    # puis les cumuls sont recalculés sur les nœuds. L'index courant n'est pas modifié.
+    def with_delta(self, sheet, added, removed=None):
+        n = len(self.tree)
+        own = dict(self.own)
+        if sheet == "Salaire":
+            own["masse_salariale"] = own["masse_salariale"] + self._own_sum(added, "Salaire_Brut", self.position_of, n) \
+                - self._own_sum(removed, "Salaire_Brut", self.position_of, n)
+        elif sheet == "Présences_Absences":
+            added_abs, added_pts = self._own_presences(added, self.position_of, n)
+            removed_abs, removed_pts = self._own_presences(removed, self.position_of, n)
+            own["absences"] = own["absences"] + added_abs - removed_abs
+            own["pointages"] = own["pointages"] + added_pts - removed_pts
+        else:
+            return self
+        updated = copy.copy(self)
+        updated.own = own
+        updated.rollups = self._rollup(own)
+        return updated
+
+    @staticmethod
+    def _own_sum(frame, column, position_of, n):
+        if frame is None or frame.empty or "Matricule" not in frame.columns:
+            return np.zeros(n)
+        positions = frame["Matricule"].map(position_of)
+        known = positions.notna().to_numpy()
+        weights = None
+        if column is not None:
+            weights = pd.to_numeric(frame[column], errors="coerce").fillna(0).to_numpy()[known]
+        return np.bincount(positions.to_numpy()[known].astype(np.int64), weights=weights, minlength=n).astype(float)
+
+    # Matricules de tous les employés sous un nœud : simple recherche par intervalle
+    def employees_under(self, node):
+        lo = np.searchsorted(self.positions, self.tree.tin[node], side="left")
+        hi = np.searchsorted(self.positions, self.tree.tout[node], side="left")
+        return self.matricules[lo:hi]
+
+    # Indicateurs cumulés d'un nœud, ou de plusieurs sous-arbres disjoints réunis
+    @traced("organigramme : cumuls")
+    def kpis(self, nodes):
+        nodes = [nodes] if isinstance(nodes, str) else list(nodes)
+        totals = self.rollups.loc[nodes, ["effectif", "masse_salariale", "departs", "absences", "pointages"]].sum()
+        result = totals.to_dict()
+        result["taux_turnover"] = totals["departs"] / totals["effectif"] * 100 if totals["effectif"] > 0 else float("nan")
+        result["taux_absenteisme"] = totals["absences"] / totals["pointages"] * 100 if totals["pointages"] > 0 else float("nan")
+        return result
@@ -0,0 +1,72 @@
+# Tableaux paginés côté serveur pour l'onglet « Analyse individuelle ».
+# Le tri et le filtre par période portent sur toute la tranche de l'employé, mais
+# seule la page visible est mise en forme et envoyée au navigateur. Les résumés
+# (absences par mois, totaux par type d'événement) sont calculés sur la tranche entière.
+import math
+
+import pandas as pd
+
+from omnis.formatting import classify_columns, format_df
+
+PAGE_SIZES = (10, 25, 50, 100)
+
+
+# Première colonne de dates (type datetime) d'une feuille ; None s'il n'y en a pas
+def date_column(df):
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            return col
+    return None
+
+
+# Lignes dont la date est comprise entre `start` et `end` (bornes incluses, None = ouverte)
+def filter_period(df, column, start=None, end=None):
+    if column is None or (start is None and end is None):
+        return df
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df[column] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df[column] < pd.Timestamp(end) + pd.Timedelta(days=1)
+    return df[mask]
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+# Page `page` (à partir de 0) triée sur `sort_by`, mise en forme pour l'affichage
+def page_of(df, page, page_size, sort_by=None, ascending=True):
+    if sort_by is not None:
+        df = df.sort_values(sort_by, ascending=ascending, kind="stable", na_position="last")
+    start = page * page_size
+    return format_df(df.iloc[start:start + page_size])
+
+
+# Jours d'absence par mois et par type (toutes les lignes hors « Présence »)
+def absences_par_mois(presences):
+    if presences.empty or not {"Date", "Type"} <= set(presences.columns):
+        return pd.DataFrame()
+    absent = presences[presences["Type"] != "Présence"]
+    dates = pd.to_datetime(absent["Date"], errors="coerce")
+    months = dates.dt.to_period("M").astype(str).rename("Mois")
+    counts = absent.groupby([months, absent["Type"].rename("Type")], observed=True).size()
+    counts = counts[counts > 0]
+    if counts.empty:
+        return pd.DataFrame()
+    table = counts.unstack("Type", fill_value=0).sort_index()
+    table.columns = table.columns.astype(str)
+    return table
+
+
+# Nombre d'événements et montants cumulés par type (sanctions, bonus, promotions...)
+def totaux_historique(historique):
+    if historique.empty or "Type" not in historique.columns:
+        return pd.DataFrame()
+    schema = tuple((col, pd.api.types.is_datetime64_any_dtype(historique[col])) for col in historique.columns)
+    monetary, _ = classify_columns(schema)
+    grouped = historique.groupby("Type", observed=True)
+    totals = grouped.size().rename("Nombre").to_frame()
+    for col in monetary:
+        totals[col] = pd.to_numeric(historique[col], errors="coerce").groupby(historique["Type"], observed=True).sum()
+    return totals[totals["Nombre"] > 0].reset_index()
@@ -0,0 +1,169 @@
+# Chargement d'un import (classeur + ZIP photos + ZIP CV) dans un thread de fond.
+# Chaque étape publie sa progression ; dès que les feuilles Identité et
+# Poste_et_Carrière sont lues, un jeu de données partiel est publié pour afficher
+# le tableau de bord pendant que le reste (autres feuilles, ZIP) se termine.
+import contextvars
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from omnis.assets import ZipAssetStore
+from omnis.cache import evict_cache, hash_bytes, read_cached, write_cached
+from omnis.instrument import record_timings, span
+from omnis.loader import default_engine, parse_sheet, sheet_names
+from omnis.registry import REGISTRY
+from omnis.schema import normalize_dataset
+from omnis.store import STORE
+
+# Feuilles nécessaires au premier affichage
+CORE_SHEETS = ("Identité", "Poste_et_Carrière")
+STAGES = ("Identité et postes", "Photos", "CV", "Autres feuilles", "Structures")
+STORE_STAGE = "Enregistrement local"
+
+# Avancement du chargement : rien de prêt, jeu partiel publié, terminé (ou en erreur)
+PHASE_START, PHASE_PARTIAL, PHASE_DONE = 0, 1, 2
+
+
+# Jeu de données partiel, même interface qu'une poignée du registre (rien à libérer)
+class PartialDataset:
+    def __init__(self, digest, data, derived, info):
+        self.digest = digest
+        self.data = data
+        self.derived = derived
+        self.info = info
+
+    def release(self):
+        pass
+
+
+class LoadJob:
+    # `prepare(data)` construit les structures dérivées (index, cube, organigramme)
+    def __init__(self, content, photos, cvs, prepare, parallel=False, persist=False):
+        self.content, self.photos_content, self.cvs_content = content, photos, cvs
+        self.prepare = prepare
+        self.parallel = parallel
+        self.persist = persist
+        stages = STAGES + ((STORE_STAGE,) if persist else ())
+        self.stages = {name: {"progression": 0.0, "detail": ""} for name in stages}
+        self.digest = hash_bytes(content)
+        self.partial = None
+        self.handle = None
+        self.photos = None
+        self.cvs = None
+        self.error = None
+        self.started = time.perf_counter()
+        # Le thread hérite du contexte de la session (traceur d'instrumentation actif)
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(target=context.run, args=(self._run,), name=f"omnis-load-{self.digest[:8]}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def done(self):
+        return self.handle is not None or self.error is not None
+
+    @property
+    def phase(self):
+        if self.done:
+            return PHASE_DONE
+        return PHASE_PARTIAL if self.partial is not None else PHASE_START
+
+    def _stage(self, name, progression, detail=""):
+        self.stages[name] = {"progression": progression, "detail": detail}
+
+    def _run(self):
+        try:
+            handle = REGISTRY.acquire(self.digest, self._build)
+            # Jeu déjà en mémoire (autre session) : aucune feuille à lire
+            for name in ("Identité et postes", "Autres feuilles", "Structures"):
+                if self.stages[name]["progression"] < 1:
+                    self._stage(name, 1.0, "déjà en mémoire")
+            if self.photos is None:
+                self._index_assets()
+            if self.persist:
+                self._stage(STORE_STAGE, 0.0, "en cours")
+                STORE.save(self.digest, handle.data, self.photos_content, self.cvs_content)
+                self._stage(STORE_STAGE, 1.0)
+            # Publié en dernier : la session bascule sur le jeu complet une fois tout terminé
+            self.handle = handle
+        except Exception as e:
+            self.error = e
+
+    # Indexation des ZIP (répertoire central uniquement) ; photos et CV sont publiés
+    # ensemble, pour qu'une session ne récupère jamais l'un sans l'autre
+    def _index_assets(self):
+        photos = ZipAssetStore(self.photos_content)
+        self._stage("Photos", 1.0, f"{len(photos)} fichiers")
+        cvs = ZipAssetStore(self.cvs_content)
+        self._stage("CV", 1.0, f"{len(cvs)} fichiers")
+        self.cvs = cvs
+        self.photos = photos
+
+    def _build(self):
+        raw = read_cached(self.digest)
+        timings = {}
+        from_cache = raw is not None
+        if from_cache:
+            self._publish_partial({sheet: raw[sheet] for sheet in CORE_SHEETS if sheet in raw})
+            self._index_assets()
+            self._stage("Autres feuilles", 1.0, "cache disque")
+        else:
+            raw, timings = self._parse()
+            write_cached(self.digest, raw)
+            evict_cache()
+        self._stage("Structures", 0.0, "en cours")
+        data, memory = normalize_dataset(raw)
+        with span("structures dérivées", rows=sum(len(df) for df in data.values())):
+            derived = self.prepare(data)
+        self._stage("Structures", 1.0)
+        info = {"from_cache": from_cache, "seconds": time.perf_counter() - self.started, "timings": timings, "memoire": memory}
+        return data, derived, info
+
+    def _publish_partial(self, core):
+        data, memory = normalize_dataset(core)
+        info = {"from_cache": False, "seconds": time.perf_counter() - self.started, "timings": {}, "memoire": memory}
+        self.partial = PartialDataset(f"{self.digest}:partiel", data, self.prepare(data), info)
+        self._stage("Identité et postes", 1.0, " + ".join(f"{len(df)} lignes" for df in core.values()))
+
+    # Lecture feuille par feuille : Identité et Poste_et_Carrière d'abord, puis les ZIP,
+    # puis les autres feuilles (en parallèle si demandé)
+    def _parse(self):
+        engine = default_engine()
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.content)
+            names = sheet_names(path, engine)
+            core = [name for name in names if name in CORE_SHEETS]
+            others = [name for name in names if name not in CORE_SHEETS]
+            results = {}
+            for i, name in enumerate(core):
+                self._stage("Identité et postes", i / len(core), name)
+                _, df, timing = parse_sheet(path, name, engine)
+                results[name] = (df, timing)
+            self._publish_partial({name: results[name][0] for name in core})
+            self._index_assets()
+
+            if self.parallel and len(others) > 1:
+                with ProcessPoolExecutor(max_workers=min(len(others), os.cpu_count() or 1)) as pool:
+                    futures = [pool.submit(parse_sheet, path, name, engine) for name in others]
+                    for i, future in enumerate(as_completed(futures), start=1):
+                        name, df, timing = future.result()
+                        results[name] = (df, timing)
+                        self._stage("Autres feuilles", i / len(others), name)
+            else:
+                for i, name in enumerate(others):
+                    self._stage("Autres feuilles", i / len(others), name)
+                    _, df, timing = parse_sheet(path, name, engine)
+                    results[name] = (df, timing)
+            self._stage("Autres feuilles", 1.0, f"{len(others)} feuilles")
+        finally:
+            os.remove(path)
+        data = {name: results[name][0] for name in names}
+        timings = {name: results[name][1] for name in names}
+        record_timings(timings)
+        return data, timings
@@ -0,0 +1,121 @@
+# Registre des jeux de données partagé par toutes les sessions du processus.
+# Un classeur (identifié par son empreinte) n'est chargé qu'une fois, quel que soit
+# le nombre d'utilisateurs qui l'ouvrent : chaque session ne garde qu'une poignée
+# vers l'entrée commune. Les entrées sans session sont évincées (LRU) au-delà d'un
+# plafond mémoire.
+import os
+import threading
+import time
+import weakref
+
+import pandas as pd
+
+MAX_MEMORY_BYTES = int(os.environ.get("OMNIS_RH_MAX_MEMORY_MB", "2048")) * 1024 * 1024
+
+# Avec le copy-on-write, une modification faite par une session sur sa vue ne touche
+# jamais les données partagées (toujours actif à partir de pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def frames_nbytes(data):
+    return int(sum(df.memory_usage(deep=True).sum() for df in data.values()))
+
+
+class DatasetEntry:
+    def __init__(self, digest, data, derived, info):
+        self.digest = digest
+        self.data = data
+        self.derived = derived
+        self.info = info
+        self.nbytes = frames_nbytes(data)
+        self.refcount = 0
+        self.last_access = time.monotonic()
+
+
+class DatasetHandle:
+    # Poignée détenue par une session ; libérée explicitement ou à sa destruction
+    def __init__(self, registry, entry):
+        self.digest = entry.digest
+        self._entry = entry
+        # Vues superficielles : aucune copie des données, écritures isolées par copy-on-write
+        self.data = {sheet: df.copy(deep=False) for sheet, df in entry.data.items()}
+        self._finalizer = weakref.finalize(self, registry._release, entry.digest)
+
+    @property
+    def derived(self):
+        return self._entry.derived
+
+    @property
+    def info(self):
+        return self._entry.info
+
+    def release(self):
+        self._finalizer()
+
+
+class DatasetRegistry:
+    def __init__(self, max_bytes=MAX_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._building = {}
+
+    # Poignée vers le jeu de données `digest`, construit par `builder()` s'il est absent.
+    # `builder` renvoie (données, structures dérivées, infos de chargement).
+    def acquire(self, digest, builder):
+        with self._lock:
+            build_lock = self._building.setdefault(digest, threading.Lock())
+        # Un seul chargement par empreinte, même si plusieurs sessions arrivent ensemble
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(digest)
+            if entry is None:
+                data, derived, info = builder()
+                entry = DatasetEntry(digest, data, derived, info)
+                with self._lock:
+                    self._entries[digest] = entry
+            with self._lock:
+                entry.refcount += 1
+                entry.last_access = time.monotonic()
+                self._building.pop(digest, None)
+                self._evict()
+        return DatasetHandle(self, entry)
+
+    def __contains__(self, digest):
+        return digest in self._entries
+
+    def _release(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry.refcount = max(0, entry.refcount - 1)
+                entry.last_access = time.monotonic()
+            self._evict()
+
+    # Éviction LRU des entrées inutilisées tant que le plafond mémoire est dépassé
+    def _evict(self):
+        total = sum(entry.nbytes for entry in self._entries.values())
+        idle = sorted((e for e in self._entries.values() if e.refcount == 0), key=lambda e: e.last_access)
+        for entry in idle:
+            if total <= self.max_bytes:
+                break
+            del self._entries[entry.digest]
+            total -= entry.nbytes
+
+    # Suppression d'une entrée (ou de toutes) ; les sessions ouvertes gardent leur vue
+    def invalidate(self, digest=None):
+        with self._lock:
+            if digest is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(digest, None)
+
+    # État du registre : une ligne par jeu de données
+    def stats(self):
+        with self._lock:
+            return [{"digest": e.digest, "sessions": e.refcount, "octets": e.nbytes}
+                    for e in sorted(self._entries.values(), key=lambda e: -e.last_access)]
+
+
+REGISTRY = DatasetRegistry()
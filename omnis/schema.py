@@ -0,0 +1,80 @@
+# Normalisation des types à la lecture : chaque feuille connue reçoit une fois pour
+# toutes ses types numériques, dates et catégories, pour que les onglets travaillent
+# sur des tableaux compacts et déjà typés (sans to_numeric répétés ni copies).
+import pandas as pd
+
+from omnis.formatting import MONETARY_KEYWORDS
+from omnis.instrument import frame_rows, traced
+
+SCHEMAS = {
+    "Identité": {
+        "dates": ["Date_Naissance"],
+        "categories": ["Sexe", "Niveau_études"],
+    },
+    "Poste_et_Carrière": {
+        "numeric": ["Ancienneté"],
+        "categories": ["Direction", "Département", "Poste_Actuel"],
+    },
+    "Salaire": {
+        "numeric": ["Salaire_Brut"],
+        "categories": ["Mois"],
+    },
+    "Présences_Absences": {
+        "numeric": ["Congé_restant"],
+        "dates": ["Date"],
+        "categories": ["Type"],
+    },
+    "Missions": {
+        "categories": ["Statut"],
+    },
+    "Évaluations": {},
+    "Formations": {},
+    "Historique": {
+        "dates": ["Date"],
+        "categories": ["Type"],
+    },
+    "Turnover": {
+        "categories": ["Motif"],
+    },
+}
+
+
+def _is_lossless(original, converted):
+    return not (converted.isna() & original.notna()).any()
+
+
+# Conversion d'une feuille selon son schéma ; renvoie une nouvelle DataFrame
+def normalize_sheet(df, schema):
+    df = df.copy()
+    for col in schema.get("numeric", []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    # Colonnes monétaires (mêmes mots-clés que l'affichage) : converties en nombres
+    # uniquement si aucune valeur n'est perdue
+    for col in df.columns:
+        if col not in schema.get("numeric", []) and not pd.api.types.is_numeric_dtype(df[col]) \
+                and not pd.api.types.is_datetime64_any_dtype(df[col]) and any(keyword in str(col).lower() for keyword in MONETARY_KEYWORDS):
+            converted = pd.to_numeric(df[col], errors="coerce")
+            if _is_lossless(df[col], converted):
+                df[col] = converted
+    for col in schema.get("dates", []):
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            converted = pd.to_datetime(df[col], errors="coerce", format="mixed")
+            if _is_lossless(df[col], converted):
+                df[col] = converted
+    for col in schema.get("categories", []):
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+# Normalisation de tout le classeur ; renvoie (données, rapport mémoire par feuille)
+@traced("typage des feuilles", rows=lambda result: frame_rows(result[0]))
+def normalize_dataset(data):
+    normalized, report = {}, {}
+    for sheet, df in data.items():
+        before = int(df.memory_usage(deep=True).sum())
+        normalized[sheet] = normalize_sheet(df, SCHEMAS.get(sheet, {}))
+        after = int(normalized[sheet].memory_usage(deep=True).sum())
+        report[sheet] = {"avant": before, "apres": after}
+    return normalized, report
@@ -0,0 +1,172 @@
+# Index de recherche des employés (matricule, nom, prénom, département, poste).
+# Construit une fois au chargement : les valeurs sont normalisées (minuscules,
+# sans accents) et triées pour les recherches exactes et par préfixe ; un index
+# de trigrammes couvre les recherches « contient ».
+import bisect
+import functools
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from omnis.instrument import traced
+
+IDENTITY_FIELDS = ["Matricule", "Nom", "Prénom"]
+POSTE_FIELDS = ["Département", "Poste_Actuel"]
+DEFAULT_FIELDS = IDENTITY_FIELDS
+
+# Ordre de priorité des champs à niveau de correspondance égal
+FIELD_ORDER = IDENTITY_FIELDS + POSTE_FIELDS
+
+
+# Normalisation : minuscules, sans accents ni espaces superflus ("Ranaivosoa" == "RANAIVOSOA")
+def normalize(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    return _normalize_text(str(value))
+
+
+@functools.lru_cache(maxsize=65536)
+def _normalize_text(text):
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+# Code entier d'un trigramme : trois points de code Unicode (21 bits chacun) sur 63 bits
+def _gram_codes(codes):
+    return (codes[..., :-2] << 42) | (codes[..., 1:-1] << 21) | codes[..., 2:]
+
+
+# Index inversé code de trigramme → lignes triées, construit de façon vectorisée
+# sur la matrice des points de code des valeurs normalisées
+def _build_trigrams(values):
+    if not values:
+        return {}
+    matrix = np.array(values, dtype=str)
+    width = matrix.dtype.itemsize // 4
+    if width < 3:
+        return {}
+    codes = matrix.view(np.uint32).reshape(len(values), width).astype(np.uint64)
+    lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values))
+    grams = _gram_codes(codes)
+    valid = np.arange(width - 2)[None, :] < (lengths - 2)[:, None]
+    rows = np.broadcast_to(np.arange(len(values), dtype=np.int32)[:, None], grams.shape)[valid]
+    grams = grams[valid]
+    order = np.lexsort((rows, grams))
+    grams, rows = grams[order], rows[order]
+    keep = np.ones(len(grams), dtype=bool)
+    keep[1:] = (grams[1:] != grams[:-1]) | (rows[1:] != rows[:-1])
+    grams, rows = grams[keep], rows[keep]
+    bounds = np.flatnonzero(grams[1:] != grams[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(grams)]))
+    return {int(grams[a]): rows[a:b] for a, b in zip(starts, ends)}
+
+
+# Codes des trigrammes d'une requête normalisée
+def _query_grams(query):
+    codes = np.frombuffer(query.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    return {int(code) for code in _gram_codes(codes)}
+
+
+class SearchIndex:
+    def __init__(self, identité, poste=None):
+        identité = identité.reset_index(drop=True)
+        self.matricules = identité["Matricule"].tolist()
+        self.rows_by_matricule = {m: row for row, m in enumerate(self.matricules)}
+        self.labels = [
+            " ".join(str(v) for v in (nom, prenom) if isinstance(v, str) and v)
+            for nom, prenom in zip(identité.get("Nom", pd.Series([""] * len(identité))),
+                                   identité.get("Prénom", pd.Series([""] * len(identité))))
+        ]
+        columns = {field: identité[field] for field in IDENTITY_FIELDS if field in identité.columns}
+        if poste is not None and "Matricule" in poste.columns:
+            first = poste.drop_duplicates("Matricule").set_index("Matricule")
+            for field in POSTE_FIELDS:
+                if field in first.columns:
+                    columns[field] = identité["Matricule"].map(first[field])
+        self.fields = [field for field in FIELD_ORDER if field in columns]
+        self.values = {}
+        self.sorted_keys = {}
+        self.sorted_rows = {}
+        self.trigrams = {}
+        for field in self.fields:
+            values = [normalize(v) for v in columns[field].tolist()]
+            self.values[field] = values
+            # Clés triées : valeur complète + chaque mot, pour les préfixes en milieu de nom
+            pairs = set()
+            for row, value in enumerate(values):
+                if value:
+                    pairs.add((value, row))
+                    for token in value.split(" ")[1:]:
+                        pairs.add((token, row))
+            pairs = sorted(pairs)
+            self.sorted_keys[field] = [key for key, _ in pairs]
+            self.sorted_rows[field] = [row for _, row in pairs]
+            self.trigrams[field] = _build_trigrams(values)
+
+    def __len__(self):
+        return len(self.matricules)
+
+    def _exact(self, field, query):
+        keys, rows = self.sorted_keys[field], self.sorted_rows[field]
+        lo = bisect.bisect_left(keys, query)
+        hi = bisect.bisect_right(keys, query)
+        return (rows[i] for i in range(lo, hi))
+
+    def _prefix(self, field, query):
+        keys, rows = self.sorted_keys[field], self.sorted_rows[field]
+        lo = bisect.bisect_left(keys, query)
+        hi = bisect.bisect_left(keys, query + "￿")
+        return (rows[i] for i in range(lo, hi))
+
+    def _contains(self, field, query):
+        postings = self.trigrams[field]
+        lists = [postings.get(gram) for gram in _query_grams(query)]
+        if any(rows is None for rows in lists):
+            return iter(())
+        lists.sort(key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            # Au-delà d'un petit nombre de candidats, la vérification directe coûte moins
+            # qu'une intersection supplémentaire avec une longue liste
+            if len(candidates) <= 256 or len(rows) > 4 * len(candidates):
+                break
+            member = np.zeros(len(self.matricules), dtype=bool)
+            member[rows] = True
+            candidates = candidates[member[candidates]]
+            if len(candidates) == 0:
+                return iter(())
+        values = self.values[field]
+        return (int(row) for row in candidates if query in values[row])
+
+    # Recherche classée : correspondance exacte, puis préfixe, puis « contient »
+    # (à partir de 3 caractères) ; à niveau égal, l'ordre de FIELD_ORDER s'applique.
+    # Renvoie au plus `k` matricules.
+    @traced("recherche", rows=len)
+    def search(self, query, k=20, fields=None):
+        query = normalize(query)
+        if not query:
+            return []
+        fields = [field for field in (fields or DEFAULT_FIELDS) if field in self.values]
+        tiers = [self._exact, self._prefix]
+        if len(query) >= 3:
+            tiers.append(self._contains)
+        seen = set()
+        results = []
+        for tier in tiers:
+            for field in fields:
+                for row in tier(field, query):
+                    if row not in seen:
+                        seen.add(row)
+                        results.append(self.matricules[row])
+                        if len(results) >= k:
+                            return results
+        return results
+
+    # Libellé d'affichage « Nom Prénom » d'un matricule
+    def label(self, matricule):
+        row = self.rows_by_matricule.get(matricule)
+        return self.labels[row] if row is not None else ""
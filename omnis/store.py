@@ -0,0 +1,168 @@
+# Stockage local persistant (SQLite) des feuilles RH et des ZIP importés.
+# Chaque feuille devient une table indexée sur sa clé naturelle (Matricule, puis Mois
+# ou Date) : l'application redémarre sans nouvel import, et les imports mensuels
+# remplacent les lignes par clé sans réécrire toute la base. Les onglets travaillent
+# ensuite sur le jeu relu en mémoire (index, cube, séries précalculées).
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from omnis.ingest import NATURAL_KEYS
+
+STORE_DIR = os.environ.get("OMNIS_RH_STORE_DIR", ".omnis_rh_store")
+DB_NAME = "rh.sqlite"
+PHOTOS_NAME = "photos.zip"
+CVS_NAME = "cvs.zip"
+META_TABLE = "_omnis_meta"
+SHEETS_TABLE = "_omnis_feuilles"
+
+
+# Colonnes de l'index d'une feuille : clé naturelle des suppressions de append(),
+# à défaut le seul Matricule
+def _index_columns(sheet, df):
+    keys = NATURAL_KEYS.get(sheet, [])
+    if keys and set(keys) <= set(df.columns):
+        return keys
+    return ["Matricule"] if "Matricule" in df.columns else []
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _write_atomic(path, content):
+    tmp = f"{path}.tmp-{os.getpid()}-{time.time_ns()}"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+# Lignes d'une DataFrame en valeurs Python liables par sqlite3 (dates au format de to_sql)
+def _records(df):
+    columns = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime("%Y-%m-%d %H:%M:%S")
+        values = values.astype(object)
+        columns.append(values.where(values.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+class LocalStore:
+    def __init__(self, directory=None):
+        self.directory = directory or STORE_DIR
+        self.path = os.path.join(self.directory, DB_NAME)
+        # Une connexion par thread (Streamlit exécute chaque session dans son thread)
+        self._local = threading.local()
+
+    # Connexion du thread courant ; rouverte si la base a été remplacée entre-temps
+    def _connect(self):
+        inode = os.stat(self.path).st_ino
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.inode != inode:
+            if conn is not None:
+                conn.close()
+            conn = sqlite3.connect(self.path)
+            self._local.conn, self._local.inode = conn, inode
+        return conn
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # Métadonnées du dernier import : empreinte, date, feuilles
+    def meta(self):
+        if not self.exists():
+            return None
+        rows = dict(self._connect().execute(f"SELECT cle, valeur FROM {META_TABLE}").fetchall())
+        return {"digest": rows.get("digest"), "importe_le": float(rows.get("importe_le", 0))}
+
+    def _sheets(self):
+        rows = self._connect().execute(f"SELECT nom, dates FROM {SHEETS_TABLE} ORDER BY ordre").fetchall()
+        return {name: json.loads(dates) for name, dates in rows}
+
+    def _columns(self, sheet):
+        return [row[1] for row in self._connect().execute(f"PRAGMA table_info({_quote(sheet)})")]
+
+    # Enregistrement complet d'un jeu de données (et des ZIP s'ils sont fournis).
+    # La base est écrite à côté puis substituée d'un bloc : un lecteur ne voit jamais
+    # un import à moitié écrit.
+    def save(self, digest, data, photos=None, cvs=None):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.path}.tmp-{os.getpid()}-{time.time_ns()}"
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute(f"CREATE TABLE {META_TABLE} (cle TEXT PRIMARY KEY, valeur TEXT)")
+            conn.execute(f"CREATE TABLE {SHEETS_TABLE} (nom TEXT PRIMARY KEY, ordre INTEGER, dates TEXT)")
+            for order, (sheet, df) in enumerate(data.items()):
+                dates = [str(col) for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+                df.to_sql(sheet, conn, index=False)
+                index = _index_columns(sheet, df)
+                if index:
+                    names = ", ".join(_quote(col) for col in index)
+                    conn.execute(f"CREATE INDEX {_quote(f'idx_{sheet}_cle')} ON {_quote(sheet)} ({names})")
+                conn.execute(f"INSERT INTO {SHEETS_TABLE} VALUES (?, ?, ?)", (sheet, order, json.dumps(dates, ensure_ascii=False)))
+            conn.executemany(f"INSERT INTO {META_TABLE} VALUES (?, ?)", [("digest", digest), ("importe_le", str(time.time()))])
+            conn.commit()
+        except Exception:
+            conn.close()
+            os.remove(tmp)
+            raise
+        conn.close()
+        os.replace(tmp, self.path)
+        if photos is not None:
+            _write_atomic(os.path.join(self.directory, PHOTOS_NAME), photos)
+        if cvs is not None:
+            _write_atomic(os.path.join(self.directory, CVS_NAME), cvs)
+
+    # Ajout incrémental (omnis.ingest) : pour chaque feuille, les lignes de même clé
+    # naturelle sont supprimées puis les lignes du delta insérées, le tout dans une
+    # seule transaction qui met aussi à jour l'empreinte enregistrée
+    def append(self, digest, changes, keys_by_sheet):
+        conn = self._connect()
+        with conn:
+            for sheet, change in changes.items():
+                columns = self._columns(sheet)
+                added = change["ajoutees"][[col for col in change["ajoutees"].columns if str(col) in columns]]
+                keys = keys_by_sheet[sheet]
+                where = " AND ".join(f"{_quote(key)} = ?" for key in keys)
+                conn.executemany(f"DELETE FROM {_quote(sheet)} WHERE {where}", _records(added[keys]))
+                placeholders = ", ".join("?" * len(added.columns))
+                names = ", ".join(_quote(col) for col in added.columns)
+                conn.executemany(f"INSERT INTO {_quote(sheet)} ({names}) VALUES ({placeholders})", _records(added))
+            conn.execute(f"UPDATE {META_TABLE} SET valeur = ? WHERE cle = 'digest'", (digest,))
+
+    # Relecture de toutes les feuilles ; renvoie (empreinte, données)
+    def load(self):
+        conn = self._connect()
+        data = {}
+        for sheet, dates in self._sheets().items():
+            data[sheet] = pd.read_sql_query(f"SELECT * FROM {_quote(sheet)}", conn, parse_dates=dates)
+        return self.meta()["digest"], data
+
+    # Chemins des ZIP enregistrés (None si absents)
+    def assets(self):
+        paths = []
+        for name in (PHOTOS_NAME, CVS_NAME):
+            path = os.path.join(self.directory, name)
+            paths.append(path if os.path.exists(path) else None)
+        return tuple(paths)
+
+    def clear(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        for name in (DB_NAME, PHOTOS_NAME, CVS_NAME):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+# Stockage partagé par toutes les sessions du serveur
+STORE = LocalStore()
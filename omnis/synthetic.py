@@ -0,0 +1,208 @@
+# Générateur de jeux de données RH fictifs au format OMNIS (9 feuilles + ZIP photos/CV).
+# Sert aux benchmarks et aux démonstrations : les vraies données RH ne quittent pas
+# le service. Les directions et départements proviennent de l'organigramme.
+import io
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from omnis.assets import cv_name, photo_name
+from omnis.organisation import ROOT, directions_mapping
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+EXCEL_MAX_ROWS = 1_048_576
+
+NOMS = ["Rakoto", "Rabe", "Rasoa", "Randria", "Razafy", "Ranaivo", "Rasolofo", "Andria", "Rajaona", "Ravelo",
+        "Raharison", "Rakotondrabe", "Ramanantsoa", "Razanakoto", "Andrianjafy", "Rasoanaivo"]
+PRENOMS_H = ["Hery", "Tojo", "Fara", "Mamy", "Naina", "Rivo", "Solo", "Tiana", "Haja", "Fidy"]
+PRENOMS_F = ["Lalao", "Voahangy", "Hanta", "Miora", "Fanja", "Nirina", "Soa", "Tahina", "Volana", "Onja"]
+NIVEAUX = ["Baccalauréat", "Licence", "Master", "Ingénieur", "Doctorat"]
+COMPETENCES = ["Excel", "Gestion de projet", "SIG", "Géologie", "Comptabilité", "Droit minier", "Python", "HSE"]
+POSTES = ["Agent", "Technicien", "Assistant", "Chargé d'études", "Chef de service", "Directeur"]
+SALAIRE_BASE = [600_000, 900_000, 1_100_000, 1_800_000, 3_000_000, 6_000_000]
+TYPES_PRESENCE = ["Présence", "Congé", "Maladie", "Absence injustifiée", "Mission"]
+PROBA_PRESENCE = [0.88, 0.05, 0.03, 0.01, 0.03]
+TYPES_HISTORIQUE = ["Bonus", "Sanction", "Promotion", "Mutation"]
+MONTANTS_HISTORIQUE = [150_000, 50_000, 0, 0]
+STATUTS_MISSION = ["En cours", "Terminée", "Planifiée"]
+FORMATIONS = ["Excel avancé", "Sécurité sur site", "Management", "Anglais", "SIG", "Audit interne"]
+MOTIFS_DEPART = ["Démission", "Retraite", "Fin de contrat", "Licenciement", "Décès"]
+
+
+# Couples (direction, département) : chaque nœud « Direction ... » hors DG et ses enfants
+def direction_pairs(mapping=None):
+    mapping = directions_mapping if mapping is None else mapping
+    return [(direction, departement) for direction, departements in mapping.items()
+            if direction != ROOT and direction.lower().startswith("direction") for departement in departements]
+
+
+def _months(start, n_months):
+    return pd.period_range(start, periods=n_months, freq="M")
+
+
+# Jeu de données complet ; `pointages_par_mois` lignes de présence par employé et par mois
+def generate_dataset(n_employes, n_mois=12, debut="2024-01", pointages_par_mois=2, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_employes
+    matricules = np.arange(10_000, 10_000 + n)
+    months = _months(debut, n_mois)
+    month_start = months.to_timestamp()
+
+    femme = rng.random(n) < 0.45
+    prenoms = np.where(femme, np.array(PRENOMS_F)[rng.integers(0, len(PRENOMS_F), n)],
+                       np.array(PRENOMS_H)[rng.integers(0, len(PRENOMS_H), n)])
+    identité = pd.DataFrame({
+        "Matricule": matricules,
+        "Nom": np.char.add(np.array(NOMS)[rng.integers(0, len(NOMS), n)], np.char.mod("%d", rng.integers(1, 999, n))),
+        "Prénom": prenoms,
+        "Date_Naissance": pd.Timestamp("1965-01-01") + pd.to_timedelta(rng.integers(0, 35 * 365, n), unit="D"),
+        "Sexe": np.where(femme, "Femme", "Homme"),
+        "Niveau_études": np.array(NIVEAUX)[rng.integers(0, len(NIVEAUX), n)],
+        "Compétences_clés": np.array(COMPETENCES)[rng.integers(0, len(COMPETENCES), n)],
+    })
+
+    pairs = direction_pairs()
+    pick = rng.integers(0, len(pairs), n)
+    level = np.minimum(rng.geometric(0.45, n) - 1, len(POSTES) - 1)
+    poste = pd.DataFrame({
+        "Matricule": matricules,
+        "Direction": [pairs[i][0] for i in pick],
+        "Département": [pairs[i][1] for i in pick],
+        "Poste_Actuel": np.array(POSTES)[level],
+        "Ancienneté": rng.integers(0, 30, n),
+    })
+
+    # Salaire : base du poste ± 20 %, puis légère variation mensuelle
+    base = np.array(SALAIRE_BASE)[level] * rng.uniform(0.8, 1.2, n)
+    salaire = pd.DataFrame({
+        "Matricule": np.repeat(matricules, n_mois),
+        "Mois": np.tile(months.strftime("%Y-%m"), n),
+        "Salaire_Brut": np.round(np.repeat(base, n_mois) * rng.uniform(0.97, 1.05, n * n_mois)).astype(np.int64),
+    })
+
+    n_pres = n * n_mois * pointages_par_mois
+    day = rng.integers(0, 28, n_pres)
+    presences = pd.DataFrame({
+        "Matricule": np.repeat(matricules, n_mois * pointages_par_mois),
+        "Date": np.tile(np.repeat(month_start.to_numpy(), pointages_par_mois), n) + pd.to_timedelta(day, unit="D").to_numpy(),
+        "Type": np.array(TYPES_PRESENCE)[rng.choice(len(TYPES_PRESENCE), n_pres, p=PROBA_PRESENCE)],
+        "Congé_restant": np.repeat(rng.integers(0, 30, n), n_mois * pointages_par_mois),
+    })
+
+    n_miss = rng.integers(0, 3, n)
+    miss_mat = np.repeat(matricules, n_miss)
+    missions = pd.DataFrame({
+        "Matricule": miss_mat,
+        "Mission": np.char.add("Mission ", np.char.mod("%d", rng.integers(1, 500, len(miss_mat)))),
+        "Statut": np.array(STATUTS_MISSION)[rng.integers(0, len(STATUTS_MISSION), len(miss_mat))],
+        "Date_Début": month_start[0] + pd.to_timedelta(rng.integers(0, 30 * n_mois, len(miss_mat)), unit="D"),
+    })
+
+    years = sorted(set(months.year))
+    évaluations = pd.DataFrame({
+        "Matricule": np.repeat(matricules, len(years)),
+        "Année": np.tile(years, n),
+        "Note": rng.integers(1, 6, n * len(years)),
+    })
+
+    n_form = rng.integers(0, 3, n)
+    form_mat = np.repeat(matricules, n_form)
+    formations = pd.DataFrame({
+        "Matricule": form_mat,
+        "Formation": np.array(FORMATIONS)[rng.integers(0, len(FORMATIONS), len(form_mat))],
+        "Date": month_start[0] + pd.to_timedelta(rng.integers(0, 30 * n_mois, len(form_mat)), unit="D"),
+        "Coût": rng.integers(2, 30, len(form_mat)) * 50_000,
+    })
+
+    n_hist = rng.integers(0, 5, n)
+    hist_mat = np.repeat(matricules, n_hist)
+    hist_type = rng.integers(0, len(TYPES_HISTORIQUE), len(hist_mat))
+    historique = pd.DataFrame({
+        "Matricule": hist_mat,
+        "Date": pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 10 * 365, len(hist_mat)), unit="D"),
+        "Type": np.array(TYPES_HISTORIQUE)[hist_type],
+        "Montant": np.array(MONTANTS_HISTORIQUE)[hist_type] * rng.integers(1, 5, len(hist_mat)),
+    }).sort_values(["Matricule", "Date"], ignore_index=True)
+
+    partis = np.sort(rng.choice(matricules, size=int(n * 0.08), replace=False))
+    turnover = pd.DataFrame({
+        "Matricule": partis,
+        "Date_Départ": month_start[0] + pd.to_timedelta(rng.integers(0, 30 * n_mois, len(partis)), unit="D"),
+        "Motif": np.array(MOTIFS_DEPART)[rng.integers(0, len(MOTIFS_DEPART), len(partis))],
+    })
+
+    return {
+        "Identité": identité,
+        "Poste_et_Carrière": poste,
+        "Salaire": salaire,
+        "Présences_Absences": presences,
+        "Missions": missions,
+        "Évaluations": évaluations,
+        "Formations": formations,
+        "Historique": historique,
+        "Turnover": turnover,
+    }
+
+
+# Écriture du classeur (.xlsx) ; `path` peut être un chemin ou un tampon binaire
+def write_workbook(data, path):
+    too_big = [sheet for sheet, df in data.items() if len(df) + 1 > EXCEL_MAX_ROWS]
+    if too_big:
+        raise ValueError(f"feuilles trop grandes pour Excel ({EXCEL_MAX_ROWS} lignes) : {', '.join(too_big)}")
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for sheet, df in data.items():
+            df.to_excel(writer, sheet_name=sheet, index=False)
+
+
+def workbook_bytes(data):
+    buffer = io.BytesIO()
+    write_workbook(data, buffer)
+    return buffer.getvalue()
+
+
+# Quelques vignettes JPEG réutilisées (l'encodage de chaque photo n'apporte rien aux mesures)
+def _photo_variants(size, count=16):
+    from PIL import Image
+    variants = []
+    for i in range(count):
+        buffer = io.BytesIO()
+        Image.new("RGB", size, (40 + 12 * i, 90, 160 - 6 * i)).save(buffer, "JPEG", quality=80)
+        variants.append(buffer.getvalue())
+    return variants
+
+
+def _cv_pdf(matricule, nom, prenom):
+    text = f"CV {prenom} {nom} - Matricule {matricule}"
+    stream = f"BT /F1 14 Tf 72 720 Td ({text}) Tj ET".encode("latin-1", "replace")
+    return (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+            b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+            b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Contents 4 0 R"
+            b"/Resources<</Font<</F1 5 0 R>>>>>>endobj\n"
+            b"4 0 obj<</Length " + str(len(stream)).encode() + b">>stream\n" + stream + b"\nendstream endobj\n"
+            b"5 0 obj<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n")
+
+
+# ZIP des photos et des CV (dans un sous-dossier, comme les exports réels) ;
+# `part` est la proportion d'employés qui ont une photo / un CV
+def write_asset_zips(identité, photos_path, cvs_path, part=1.0, photo_size=(150, 200), seed=0):
+    rng = np.random.default_rng(seed)
+    selected = identité[rng.random(len(identité)) < part]
+    variants = _photo_variants(photo_size)
+    with zipfile.ZipFile(photos_path, "w", zipfile.ZIP_STORED) as photos:
+        for i, matricule in enumerate(selected["Matricule"]):
+            photos.writestr(f"photos/{photo_name(matricule)}", variants[i % len(variants)])
+    with zipfile.ZipFile(cvs_path, "w", zipfile.ZIP_DEFLATED) as cvs:
+        for matricule, nom, prenom in zip(selected["Matricule"], selected["Nom"], selected["Prénom"]):
+            cvs.writestr(f"cv/{cv_name(matricule)}", _cv_pdf(matricule, nom, prenom))
+
+
+# Jeu complet sur disque : rh.xlsx, photos.zip et cvs.zip dans `directory`
+def generate_files(directory, n_employes, n_mois=12, debut="2024-01", pointages_par_mois=2, part_fichiers=1.0, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    data = generate_dataset(n_employes, n_mois, debut, pointages_par_mois, seed)
+    paths = {name: os.path.join(directory, name) for name in ("rh.xlsx", "photos.zip", "cvs.zip")}
+    write_workbook(data, paths["rh.xlsx"])
+    write_asset_zips(data["Identité"], paths["photos.zip"], paths["cvs.zip"], part_fichiers, seed=seed)
+    return paths
@@ -0,0 +1,76 @@
+# Vignettes des photos d'identité : chaque photo est décodée une seule fois puis
+# conservée en JPEG (ou WebP) de 200 px dans un cache LRU borné.
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from omnis.assets import photo_name
+
+THUMBNAIL_WIDTH = 200
+MAX_THUMBNAILS = 5000
+
+
+# Réduction d'une photo en vignette ; renvoie les octets encodés
+def make_thumbnail(content, width=THUMBNAIL_WIDTH, fmt="JPEG", quality=85):
+    with Image.open(io.BytesIO(content)) as image:
+        # draft() laisse le décodeur JPEG réduire l'image à la lecture
+        image.draft("RGB", (width, width * 4))
+        image = image.convert("RGB")
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, format=fmt, quality=quality)
+    return out.getvalue()
+
+
+class ThumbnailCache:
+    def __init__(self, store, width=THUMBNAIL_WIDTH, fmt="JPEG", max_items=MAX_THUMBNAILS):
+        self.store = store
+        self.width = width
+        self.fmt = fmt
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    # Vignette d'un matricule (None si aucune photo lisible dans le ZIP)
+    def get(self, matricule):
+        key = str(matricule)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        content = self.store.read(photo_name(matricule)) if self.store is not None else None
+        thumbnail = None
+        if content is not None:
+            try:
+                thumbnail = make_thumbnail(content, self.width, self.fmt)
+            except OSError:
+                # Fichier illisible ou format non reconnu : traité comme une photo absente
+                thumbnail = None
+        with self._lock:
+            self._items[key] = thumbnail
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return thumbnail
+
+    def __len__(self):
+        return len(self._items)
+
+    # Pré-génération en arrière-plan des vignettes d'une liste de matricules
+    def prefetch(self, matricules, workers=4):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        for matricule in list(matricules)[:self.max_items]:
+            self._executor.submit(self.get, matricule)
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,158 @@
+# Séries mensuelles RH par Direction × Département × Mois : effectif payé, départs,
+# pointages, jours d'absence et motifs d'absence. Chaque feuille (Salaire, Turnover,
+# Présences_Absences) est agrégée en un seul passage groupé au chargement ; les taux
+# mensuels et glissants (3 et 12 mois) se déduisent ensuite des séries filtrées par
+# sommes cumulées, sans rebalayer les pointages.
+import copy
+
+import numpy as np
+import pandas as pd
+
+from omnis.cube import cell_mask, employee_mapping
+from omnis.instrument import traced
+
+# Feuille source → colonne donnant le mois de chaque ligne
+MONTH_COLUMNS = {
+    "Salaire": "Mois",
+    "Turnover": "Date_Départ",
+    "Présences_Absences": "Date",
+}
+WINDOWS = (3, 12)
+PRESENCE = "Présence"
+
+
+# Mois de chaque valeur (texte « 2024-01 », date...) sous forme d'entier année × 12 + mois - 1 ;
+# NaN si la valeur n'est pas une date. Le texte est lu comme dans omnis.schema et omnis.formatting
+# (« 2024-03-05 » : 5 mars). Pour une catégorie, seules les modalités sont converties.
+def month_ordinals(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        ordinals = month_ordinals(pd.Series(values.cat.categories)).to_numpy(dtype=float)
+        codes = values.cat.codes.to_numpy()
+        picked = ordinals[codes] if len(ordinals) else np.full(len(codes), np.nan)
+        return pd.Series(np.where(codes >= 0, picked, np.nan), index=values.index)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        dates = values
+    else:
+        dates = pd.to_datetime(values.astype(object), errors="coerce", format="mixed")
+    return (dates.dt.year * 12 + dates.dt.month - 1).astype(float)
+
+
+def month_label(ordinal):
+    return f"{ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
+
+
+# Somme glissante sur `window` mois (NaN tant que la fenêtre n'est pas complète)
+def rolling_sum(values, window):
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        result[window - 1:] = prefix[window:] - prefix[:-window]
+    return result
+
+
+def _ratio(numerator, denominator):
+    numerator, denominator = np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator * 100, np.nan)
+
+
+class TrendSeries:
+    # `org_tree` (omnis.organisation.OrgTree) permet de filtrer sur un sous-arbre entier
+    def __init__(self, poste, salaire=None, presences=None, turnover=None, org_tree=None):
+        mapping = employee_mapping(poste) if "Matricule" in poste.columns else pd.DataFrame(columns=["Matricule", "Direction", "Département"])
+        self.org_tree = org_tree
+        self.keys = ["Direction", "Département"]
+        if org_tree is not None:
+            mapping["Noeud"] = org_tree.positions(mapping)
+            self.keys.append("Noeud")
+        self.mapping = mapping
+        sources = {"Salaire": salaire, "Turnover": turnover, "Présences_Absences": presences}
+        self.tables = {sheet: self._build(sheet, frame) for sheet, frame in sources.items()}
+
+    # Agrégation d'une feuille en cellules (clés + mois) : employés payés distincts pour
+    # Salaire, départs pour Turnover, jours par type de pointage pour Présences_Absences
+    def _build(self, sheet, frame):
+        column = MONTH_COLUMNS[sheet]
+        by = self.keys + ["mois"] + (["Type"] if sheet == "Présences_Absences" else [])
+        if frame is None or frame.empty or not {"Matricule", column} <= set(frame.columns) \
+                or (sheet == "Présences_Absences" and "Type" not in frame.columns):
+            return pd.DataFrame(columns=by + ["valeur"])
+        rows = pd.DataFrame({"Matricule": frame["Matricule"].to_numpy(), "mois": month_ordinals(frame[column]).to_numpy()})
+        if sheet == "Présences_Absences":
+            rows["Type"] = frame["Type"].to_numpy()
+        rows = rows.dropna(subset=["mois"]).astype({"mois": np.int64})
+        if sheet == "Salaire":
+            rows = rows.drop_duplicates(["Matricule", "mois"])
+        rows = rows.merge(self.mapping, on="Matricule", how="inner")
+        return rows.groupby(by, dropna=False, observed=True).size().rename("valeur").reset_index()
+
+    # Nouvelles séries après un import mensuel : seuls les mois touchés par les lignes
+    # ajoutées / retirées sont réagrégés, à partir des lignes à jour `frame` (au moins
+    # toutes celles de ces mois, par exemple la « periode » de omnis.ingest.merge_delta)
+    def with_delta(self, sheet, frame, added, removed=None):
+        if sheet not in MONTH_COLUMNS:
+            return self
+        column = MONTH_COLUMNS[sheet]
+        touched = [delta[column] for delta in (added, removed) if delta is not None and column in delta.columns]
+        months = pd.concat([month_ordinals(values) for values in touched]).dropna().unique() if touched else []
+        if len(months) == 0:
+            return self
+        table = self.tables[sheet]
+        kept = table[~table["mois"].isin(months)]
+        fresh = self._build(sheet, frame[month_ordinals(frame[column]).isin(months)])
+        updated = copy.copy(self)
+        updated.tables = {**self.tables, sheet: pd.concat([kept, fresh], ignore_index=True) if not kept.empty else fresh}
+        return updated
+
+    # Mois couverts par au moins une série (premier et dernier, None si aucune donnée)
+    def span(self):
+        months = [table["mois"] for table in self.tables.values() if not table.empty]
+        if not months:
+            return None
+        months = pd.concat(months)
+        return int(months.min()), int(months.max())
+
+    def _select(self, sheet, direction=None, departements=None, noeuds=None):
+        table = self.tables[sheet]
+        return table[cell_mask(table, self.org_tree, direction, departements, noeuds)]
+
+    # Série mensuelle filtrée : effectif, départs, pointages, jours d'absence, taux du mois
+    # et taux glissants (turnover sur effectif moyen de la fenêtre, absentéisme sur pointages)
+    @traced("séries : tendances filtrées", rows=len)
+    def monthly(self, direction=None, departements=None, noeuds=None):
+        bounds = self.span()
+        if bounds is None:
+            return pd.DataFrame()
+        months = pd.RangeIndex(bounds[0], bounds[1] + 1, name="mois")
+        effectif = self._select("Salaire", direction, departements, noeuds).groupby("mois")["valeur"].sum()
+        departs = self._select("Turnover", direction, departements, noeuds).groupby("mois")["valeur"].sum()
+        pointages = self._select("Présences_Absences", direction, departements, noeuds)
+        absent = pointages[pointages["Type"] != PRESENCE]
+        series = pd.DataFrame({
+            "effectif": effectif.reindex(months, fill_value=0),
+            "departs": departs.reindex(months, fill_value=0),
+            "pointages": pointages.groupby("mois")["valeur"].sum().reindex(months, fill_value=0),
+            "jours_absence": absent.groupby("mois")["valeur"].sum().reindex(months, fill_value=0),
+        }).astype(np.int64)
+        series["taux_turnover"] = _ratio(series["departs"], series["effectif"])
+        series["taux_absenteisme"] = _ratio(series["jours_absence"], series["pointages"])
+        for window in WINDOWS:
+            effectif_moyen = rolling_sum(series["effectif"], window) / window
+            series[f"taux_turnover_{window}m"] = _ratio(rolling_sum(series["departs"], window), effectif_moyen)
+            series[f"taux_absenteisme_{window}m"] = _ratio(rolling_sum(series["jours_absence"], window),
+                                                         rolling_sum(series["pointages"], window))
+        series.insert(0, "Mois", [month_label(m) for m in months])
+        return series.reset_index(drop=True)
+
+    # Jours d'absence par mois (lignes) et par type (colonnes), hors « Présence »
+    def absence_types(self, direction=None, departements=None, noeuds=None):
+        pointages = self._select("Présences_Absences", direction, departements, noeuds)
+        absent = pointages[pointages["Type"] != PRESENCE]
+        if absent.empty:
+            return pd.DataFrame()
+        table = absent.groupby(["mois", "Type"], observed=True)["valeur"].sum().unstack("Type", fill_value=0)
+        table = table.loc[:, table.sum() > 0]
+        table.index = pd.Index([month_label(m) for m in table.index], name="Mois")
+        table.columns = table.columns.astype(str)
+        return table